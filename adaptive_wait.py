@@ -0,0 +1,122 @@
+"""
+Adaptive page-load and element waits for Selenium scraping.
+
+Instead of a fixed 90 s page-load timeout and a 30 s element wait on every row,
+LatencyTracker learns how long pages and the infobox actually take and derives each
+timeout from a recent high percentile (with headroom), between a floor and the old
+fixed value as ceiling. A timed-out page is retried with exponential backoff and a
+longer timeout rather than dropped. block_unused_resources stops Chrome from
+downloading images, fonts and ads, which the scraper never reads.
+"""
+
+import random
+import threading
+import time
+import weakref
+from collections import deque
+
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 1.0
+
+# Resources the parser never reads; patterns for Network.setBlockedURLs
+BLOCKED_URL_PATTERNS = (
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm',
+    '*doubleclick.net*', '*googlesyndication.com*', '*googletagservices.com*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*adservice.google.*',
+    '*amazon-adsystem.com*', '*adnxs.com*', '*pubmatic.com*', '*rubiconproject.com*',
+    '*criteo.*', '*quantserve.com*', '*scorecardresearch.com*', '*fandom.com/ad*',
+)
+
+
+def block_unused_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    """
+    Block images, fonts and ad/analytics hosts through the Chrome DevTools protocol
+    Returns False (and changes nothing) for drivers without execute_cdp_cmd
+    """
+    execute_cdp_cmd = getattr(driver, 'execute_cdp_cmd', None)
+    if execute_cdp_cmd is None:
+        return False
+    execute_cdp_cmd('Network.enable', {})
+    execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+    return True
+
+
+class LatencyTracker:
+    """
+    Sliding window of observed latencies (seconds). timeout() is the percentile of the
+    window times headroom, clamped to [floor, ceiling]; until min_samples latencies
+    have been seen it is the ceiling. Safe to share between threads.
+    """
+
+    def __init__(self, ceiling, floor=1.0, percentile=95, headroom=2.0, window=200, min_samples=10):
+        self.ceiling = ceiling
+        self.floor = floor
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self):
+        """The tracked percentile of the window, or None before min_samples"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * self.percentile / 100))]
+
+    def timeout(self, attempt=0):
+        """Timeout for an attempt; each retry doubles it, up to the ceiling"""
+        quantile = self.quantile()
+        base = self.ceiling if quantile is None else max(self.floor, quantile * self.headroom)
+        return min(self.ceiling, base * 2 ** attempt)
+
+
+class AdaptiveWaits:
+    """
+    Page-load and element-wait timeouts learnt from observed latencies, plus the
+    retry policy for pages that time out. One instance is meant to live for a whole
+    session (and can be shared by pooled drivers) so what it learns carries over.
+    """
+
+    def __init__(self, page_load=None, element=None, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+        self.page_load = page_load if page_load is not None else LatencyTracker(ceiling=90, floor=5)
+        self.element = element if element is not None else LatencyTracker(ceiling=30, floor=2)
+        self.retries = retries
+        self.backoff = backoff
+        self._page_load_timeouts = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def attempts(self):
+        """Attempt numbers 0..retries, sleeping with exponential backoff and jitter before each retry"""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff_delay(attempt))
+            yield attempt
+
+    def backoff_delay(self, attempt):
+        return self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+
+    def set_page_load_timeout(self, driver, attempt=0):
+        """Apply the page-load timeout for an attempt, skipping the round-trip if unchanged"""
+        timeout = self.page_load.timeout(attempt)
+        with self._lock:
+            try:
+                unchanged = self._page_load_timeouts.get(driver) == timeout
+            except TypeError:
+                # Drivers that cannot be weakly referenced are always updated
+                unchanged = False
+        if not unchanged:
+            driver.set_page_load_timeout(timeout)
+            with self._lock:
+                try:
+                    self._page_load_timeouts[driver] = timeout
+                except TypeError:
+                    pass
+        return timeout
@@ -0,0 +1,281 @@
+"""
+Benchmark harness for offline extraction over the saved pages in pokemonLinks_html/.
+
+Replays every saved page through parse_pokemon_page and the per-variant extraction
+many times and reports per-page parse latency, per-field latency (types, sizes and
+the whole record), throughput and peak traced memory. The expected heights and
+weights from saved_pages.EXPECTED_VARIANTS are checked first, so a fast but
+wrong parser never produces a number. Results are appended to a JSONL file keyed by
+git commit and compared against the last run from a different commit.
+
+    python benchmark_extraction.py --repeat 200
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from pokemon_html_parser import extract_variant_record, parse_pokemon_page
+from saved_pages import EXPECTED_VARIANTS, HTML_DIR
+
+DEFAULT_RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmarks.jsonl')
+DEFAULT_REPEAT = 100
+# Median slowdown (as a fraction) reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+PAGE_SUFFIX = '_(Pokémon).html'
+
+
+def load_pages(directory=HTML_DIR):
+    """Saved pages as a dict of Pokemon name -> HTML"""
+    pages = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(PAGE_SUFFIX):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                pages[name[:-len(PAGE_SUFFIX)]] = f.read()
+    return pages
+
+
+def variants_by_page(pages):
+    """Variants to extract from each page: the EXPECTED_VARIANTS ones plus the base form"""
+    variants = {name: ['No Variation'] for name in pages}
+    for case in EXPECTED_VARIANTS:
+        if case['Pokemon'] in variants and case['Variant'] not in variants[case['Pokemon']]:
+            variants[case['Pokemon']].append(case['Variant'])
+    return variants
+
+
+def check_expected_values(pages):
+    """
+    Extract every EXPECTED_VARIANTS variant once and compare height and weight
+    Raises AssertionError listing every mismatch
+    """
+    failures = []
+    for case in EXPECTED_VARIANTS:
+        if case['Pokemon'] not in pages:
+            failures.append(f"{case['Pokemon']}: no saved page")
+            continue
+        record = extract_variant_record(parse_pokemon_page(pages[case['Pokemon']]), case['Variant'])
+        got = (record['Height (m)'], record['Weight (kg)'])
+        expected = (case['Expected_Height'], case['Expected_Weight'])
+        if got != expected:
+            failures.append(f"{case['Pokemon']} / {case['Variant']}: expected {expected}, got {got}")
+    assert not failures, 'Extraction is wrong, not benchmarking:\n' + '\n'.join(failures)
+
+
+def _summary(samples_ns):
+    """Latency summary in microseconds"""
+    samples = sorted(samples_ns)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        'n': len(samples),
+        'median_us': statistics.median(samples) / 1000,
+        'mean_us': statistics.fmean(samples) / 1000,
+        'p95_us': p95 / 1000,
+        'min_us': samples[0] / 1000,
+    }
+
+
+def _time_page(html, variants, timings):
+    """One replay of a page: parse, then each field of each variant; appends ns samples to timings"""
+    clock = time.perf_counter_ns
+
+    started = clock()
+    page = parse_pokemon_page(html)
+    timings['parse'].append(clock() - started)
+
+    for variant in variants:
+        started = clock()
+        page.variant_types(variant)
+        timings['types'].append(clock() - started)
+
+        started = clock()
+        page.variant_sizes(variant)
+        timings['sizes'].append(clock() - started)
+
+        started = clock()
+        extract_variant_record(page, variant)
+        timings['record'].append(clock() - started)
+
+
+def _peak_memory(html, variants):
+    """Peak bytes allocated while parsing a page and extracting its variants"""
+    tracemalloc.start()
+    try:
+        page = parse_pokemon_page(html)
+        for variant in variants:
+            extract_variant_record(page, variant)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(pages=None, repeat=DEFAULT_REPEAT):
+    '''
+    Replays every page repeat times (after one warm-up pass) and returns a result dict:
+    per-page parse latency and peak memory, per-field latency over all pages, and
+    throughput in pages and records per second
+    '''
+    pages = load_pages() if pages is None else pages
+    check_expected_values(pages)
+    variants = variants_by_page(pages)
+
+    for name, html in pages.items():
+        _time_page(html, variants[name], {'parse': [], 'types': [], 'sizes': [], 'record': []})
+
+    per_page = {}
+    fields = {'types': [], 'sizes': [], 'record': []}
+    total_ns = 0
+    for name, html in pages.items():
+        timings = {'parse': [], 'types': [], 'sizes': [], 'record': []}
+        started = time.perf_counter_ns()
+        for _ in range(repeat):
+            _time_page(html, variants[name], timings)
+        total_ns += time.perf_counter_ns() - started
+
+        per_page[name] = {
+            'bytes': len(html.encode('utf-8')),
+            'variants': len(variants[name]),
+            'parse': _summary(timings['parse']),
+            'peak_memory_bytes': _peak_memory(html, variants[name]),
+        }
+        for field_name in fields:
+            fields[field_name].extend(timings[field_name])
+
+    seconds = total_ns / 1e9
+    records = sum(len(v) for v in variants.values()) * repeat
+    return {
+        'repeat': repeat,
+        'pages': per_page,
+        'fields': {name: _summary(samples) for name, samples in fields.items()},
+        'pages_per_second': len(pages) * repeat / seconds,
+        'records_per_second': records / seconds,
+    }
+
+
+def git_revision():
+    """(commit hash, dirty) of the working tree, or (None, False) outside git"""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status.strip())
+
+
+def save_result(result, path=DEFAULT_RESULTS_PATH):
+    """Append a result, stamped with commit, time and interpreter, to the JSONL results file"""
+    commit, dirty = git_revision()
+    entry = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        **result,
+    }
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, sort_keys=True) + '\n')
+    return entry
+
+
+def load_results(path=DEFAULT_RESULTS_PATH):
+    results = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return results
+
+
+def baseline_for(entry, results):
+    """Most recent earlier result from a different commit, or None"""
+    for previous in reversed(results):
+        if previous is not entry and previous.get('commit') != entry.get('commit'):
+            return previous
+    return None
+
+
+def compare(entry, baseline, threshold=DEFAULT_THRESHOLD):
+    '''
+    Median latency change of every page parse and every field versus a baseline
+    Returns a list of (name, baseline_us, current_us, change) for changes above threshold
+    '''
+    pairs = [(f'parse {name}', baseline['pages'].get(name, {}).get('parse'), stats['parse'])
+             for name, stats in entry['pages'].items()]
+    pairs += [(f'field {name}', baseline['fields'].get(name), stats) for name, stats in entry['fields'].items()]
+
+    regressions = []
+    for name, before, after in pairs:
+        if not before:
+            continue
+        change = after['median_us'] / before['median_us'] - 1
+        if change > threshold:
+            regressions.append((name, before['median_us'], after['median_us'], change))
+    return regressions
+
+
+def print_report(entry, baseline=None, threshold=DEFAULT_THRESHOLD):
+    print(f"Commit {entry['commit'] or 'unknown'}{' (dirty)' if entry['dirty'] else ''}, "
+          f"{entry['repeat']} repeats")
+    print(f"{'page':<12}{'KiB':>8}{'parse median':>14}{'p95':>10}{'peak KiB':>10}")
+    for name, stats in entry['pages'].items():
+        print(f"{name:<12}{stats['bytes'] / 1024:>8.0f}{stats['parse']['median_us']:>12.0f}us"
+              f"{stats['parse']['p95_us']:>8.0f}us{stats['peak_memory_bytes'] / 1024:>10.0f}")
+    for name, stats in entry['fields'].items():
+        print(f"field {name:<8} median {stats['median_us']:.1f}us  p95 {stats['p95_us']:.1f}us")
+    print(f"{entry['pages_per_second']:.0f} pages/s, {entry['records_per_second']:.0f} records/s")
+
+    if baseline is not None:
+        print(f"Compared with {baseline.get('commit') or 'unknown'}:")
+        regressions = compare(entry, baseline, threshold)
+        for name, before, after, change in regressions:
+            print(f'  REGRESSION {name}: {before:.1f}us -> {after:.1f}us ({change:+.0%})')
+        if not regressions:
+            print(f'  no median slower by more than {threshold:.0%}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='replays per page')
+    parser.add_argument('--results', default=DEFAULT_RESULTS_PATH, help='JSONL file results are appended to')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='median slowdown reported as a regression (0.10 = 10%%)')
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the results file')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on a regression')
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(repeat=args.repeat)
+    results = load_results(args.results)
+    if args.no_save:
+        commit, dirty = git_revision()
+        entry = {'commit': commit, 'dirty': dirty, **result}
+    else:
+        entry = save_result(result, args.results)
+    baseline = baseline_for(entry, results)
+    print_report(entry, baseline, args.threshold)
+
+    if args.fail_on_regression and baseline is not None and compare(entry, baseline, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
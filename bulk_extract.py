@@ -0,0 +1,161 @@
+"""
+Multi-process bulk extraction over a local corpus of saved species pages.
+
+Takes a directory of saved pages (like pokemonLinks_html/) or a .zip / .tar(.gz)
+archive of them and spreads parsing over a process pool, one page per task. The
+variant list (Pokedex Number -> Variations) is handed to each worker once through
+the pool initializer rather than pickled with every task; workers read pages
+themselves, so only a file name crosses the process boundary. Records stream back
+in Pokedex order as soon as every lower number has arrived.
+
+    for record in bulk_extract_records('pokemonLinks_html', variants_by_dex(df)):
+        ...
+"""
+
+import heapq
+import multiprocessing
+import os
+import tarfile
+import zipfile
+
+from pokemon_html_parser import NO_VARIATION, extract_variant_record, is_base_form, parse_pokemon_page, row_variations
+
+DEFAULT_CHUNKSIZE = 4
+PAGE_EXTENSIONS = ('.html', '.htm')
+
+# Per-process state set up by _init_worker
+_worker_variants = None
+_worker_archives = {}
+
+
+def variants_by_dex(df):
+    '''
+    Takes a dataframe with Pokedex Number and Variation columns (and Pokemon, see
+    row_variations) and returns a dict of Pokedex Number -> list of distinct
+    variations, in row order
+    '''
+    variants = {}
+    for dex_number, variation in zip(df['Pokedex Number'], row_variations(df)):
+        variation = NO_VARIATION if is_base_form(variation) else variation
+        forms = variants.setdefault(int(dex_number), [])
+        if variation not in forms:
+            forms.append(variation)
+    return variants
+
+
+def _is_page(name):
+    return name.lower().endswith(PAGE_EXTENSIONS)
+
+
+def corpus_sources(corpus):
+    '''
+    Tasks for every saved page in a directory or archive:
+    a file path, ('zip', archive path, member name) or ('html', name, text) for tar
+    members, which are read here because tar archives have no random access
+    '''
+    if os.path.isdir(corpus):
+        return [os.path.join(corpus, name) for name in sorted(os.listdir(corpus)) if _is_page(name)]
+    if zipfile.is_zipfile(corpus):
+        with zipfile.ZipFile(corpus) as archive:
+            return [('zip', corpus, name) for name in sorted(archive.namelist()) if _is_page(name)]
+    if tarfile.is_tarfile(corpus):
+        sources = []
+        with tarfile.open(corpus) as archive:
+            for member in archive:
+                if member.isfile() and _is_page(member.name):
+                    html = archive.extractfile(member).read().decode('utf-8', errors='replace')
+                    sources.append(('html', member.name, html))
+        return sources
+    raise ValueError(f'{corpus} is not a directory or a zip/tar archive')
+
+
+def _source_name(source):
+    if isinstance(source, str):
+        return source
+    kind, location, name = source[:3]
+    return location if kind == 'html' else f'{location}:{name}'
+
+
+def _read_source(source):
+    """(name, HTML) for one task"""
+    if isinstance(source, str):
+        with open(source, encoding='utf-8', errors='replace') as f:
+            return source, f.read()
+    kind, location, name = source[:3]
+    if kind == 'html':
+        return location, name
+    archive = _worker_archives.get(location)
+    if archive is None:
+        archive = _worker_archives[location] = zipfile.ZipFile(location)
+    return name, archive.read(name).decode('utf-8', errors='replace')
+
+
+def _init_worker(variants):
+    global _worker_variants
+    _worker_variants = variants
+
+
+def _extract_source(source):
+    '''
+    Worker task: parse one page and extract every variant listed for its Pokedex Number
+    (the base form only when there is no variant list)
+    Returns (dex number, records) or (None, error message)
+    '''
+    try:
+        name, html = _read_source(source)
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        return None, f'Could not read {_source_name(source)}: {e}'
+    try:
+        page = parse_pokemon_page(html)
+    except ValueError as e:
+        return None, f'Could not parse {name}: {e}'
+    if page.dex_number is None:
+        return None, f'No Pokedex Number in {name}'
+
+    if _worker_variants is None:
+        forms = [NO_VARIATION]
+    else:
+        forms = _worker_variants.get(page.dex_number, [])
+    records = [{'Pokedex Number': page.dex_number, 'Variation': variation,
+                **extract_variant_record(page, variation)} for variation in forms]
+    return page.dex_number, records
+
+
+def bulk_extract_records(corpus, variants=None, processes=None, chunksize=DEFAULT_CHUNKSIZE):
+    '''
+    Takes a directory or archive of saved species pages and an optional variant list
+    (see variants_by_dex) and yields keyed records in Pokedex order. Pages are parsed
+    on processes workers (default: one per core)
+    With a variant list, only the listed numbers are extracted and records are released
+    as soon as no lower listed number is still outstanding; without one, every page
+    yields its base form once all pages are parsed
+    Unparsable pages are reported and skipped
+    '''
+    sources = corpus_sources(corpus)
+    expected = sorted(variants) if variants is not None else []
+    arrived = set()
+    ready = []
+    next_expected = 0
+
+    def release():
+        nonlocal next_expected
+        # The lowest listed number that has not arrived holds back everything above it
+        while next_expected < len(expected) and expected[next_expected] in arrived:
+            next_expected += 1
+        while ready and (next_expected == len(expected) or ready[0][0] < expected[next_expected]):
+            yield from heapq.heappop(ready)[2]
+
+    processes = processes or os.cpu_count() or 1
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(variants,)) as pool:
+        for order, (dex_number, result) in enumerate(pool.imap_unordered(_extract_source, sources, chunksize)):
+            if dex_number is None:
+                print(result)
+                continue
+            if result:
+                heapq.heappush(ready, (dex_number, order, result))
+            arrived.add(dex_number)
+            if variants is not None:
+                yield from release()
+
+    while ready:
+        yield from heapq.heappop(ready)[2]
@@ -0,0 +1,270 @@
+"""
+Change detection for incremental refreshes of the master dataset.
+
+A HashStore remembers, per page, the sha256 of its infobox HTML (and its MediaWiki
+revision id when known) and, per extracted record, the sha256 of the record. A refresh
+then skips pages whose revision id is unchanged without downloading them, skips parsing
+pages whose infobox is unchanged (the rest of a page differs on every response), and
+re-merges into pokemon_dataset_MASTER.csv only the rows whose record actually changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import urllib.error
+from urllib.parse import unquote, urlencode, urlsplit
+
+import pandas as pd
+
+from checkpoint_store import row_key
+from pokemon_fetcher import (
+    DEFAULT_REQUESTS_PER_SECOND,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WORKERS,
+    _download,
+    fetch_pages,
+)
+from pokemon_html_parser import NO_VARIATION, RECORD_FIELDS, infobox_html, iter_records_from_html, row_variations
+from typed_output import UNIT_PATTERNS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_HASH_PATH = os.path.join(DATA_DIR, 'content_hashes.json')
+MASTER_CSV = os.path.join(DATA_DIR, 'pokemon_dataset_MASTER.csv')
+
+API_URL = 'https://bulbapedia.bulbagarden.net/w/api.php'
+# MediaWiki accepts up to 50 titles per query for normal clients
+REVISION_BATCH_SIZE = 50
+
+# The master's Pokemon column comes from the stats dataset, not from the page
+MERGE_FIELDS = tuple(name for name in RECORD_FIELDS if name != 'Pokemon')
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _json_value(value):
+    return None if value is None or value != value else value
+
+
+def record_hash(record):
+    """Hash of a record's extracted fields; missing values (None/NaN) hash the same"""
+    fields = {name: _json_value(record.get(name)) for name in RECORD_FIELDS}
+    return content_hash(json.dumps(fields, sort_keys=True, ensure_ascii=False))
+
+
+def _record_key(record):
+    dex_number, variation = row_key(record['Pokedex Number'], record['Variation'])
+    return f'{dex_number}|{variation}'
+
+
+class HashStore:
+    """
+    Page and record hashes from the last refresh, kept in one JSON file
+    pages: Link -> {'sha256': ..., 'revision': ...}; records: 'dex|variation' -> sha256
+    """
+
+    def __init__(self, path=DEFAULT_HASH_PATH):
+        self.path = path
+        self.pages = {}
+        self.records = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        self.pages = data.get('pages', {})
+        self.records = data.get('records', {})
+
+    def revision(self, link):
+        return self.pages.get(link, {}).get('revision')
+
+    def page_changed(self, link, digest):
+        return self.pages.get(link, {}).get('sha256') != digest
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pages': self.pages, 'records': self.records}, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def page_title(link):
+    """Wiki page title from a /wiki/ link, e.g. 'Charizard (Pokémon)'"""
+    path = urlsplit(link).path
+    return unquote(path.rsplit('/wiki/', 1)[-1]).replace('_', ' ')
+
+
+def fetch_revision_ids(links, timeout=DEFAULT_TIMEOUT, api_url=API_URL):
+    """
+    Latest revision id of each page through the MediaWiki API, 50 titles per request
+    Returns a dict of link -> revid; pages the API does not know are left out
+    Raises urllib.error.URLError (including HTTPError) or ValueError on failure
+    """
+    links = list(dict.fromkeys(links))
+    revisions = {}
+
+    for start in range(0, len(links), REVISION_BATCH_SIZE):
+        batch = links[start:start + REVISION_BATCH_SIZE]
+        by_title = {page_title(link): link for link in batch}
+        query = urlencode({'action': 'query', 'prop': 'revisions', 'rvprop': 'ids', 'format': 'json',
+                           'formatversion': '2', 'titles': '|'.join(by_title)})
+        body, _ = _download(f'{api_url}?{query}', timeout)
+        result = json.loads(body).get('query', {})
+
+        for alias in result.get('normalized', []):
+            if alias['from'] in by_title:
+                by_title[alias['to']] = by_title.pop(alias['from'])
+        for page in result.get('pages', []):
+            link = by_title.get(page.get('title'))
+            if link is not None and page.get('revisions'):
+                revisions[link] = page['revisions'][0]['revid']
+
+    return revisions
+
+
+def _master_cell(record, field):
+    """A record value in the master CSV's format: bare numbers for sizes, '' for missing"""
+    value = record.get(field)
+    if value is None or value != value:
+        return ''
+    if field in UNIT_PATTERNS:
+        match = re.search(UNIT_PATTERNS[field], str(value))
+        return match.group(1) if match else ''
+    return str(value)
+
+
+def _new_master_row(record, columns):
+    """A master CSV row for a record whose key has no row yet; stats are left empty"""
+    row = dict.fromkeys(columns, '')
+    dex_number, variation = row_key(record['Pokedex Number'], record['Variation'])
+    row['Pokedex Number'] = str(dex_number)
+    row['Variation'] = '' if variation == NO_VARIATION else variation
+    for field in ('Pokemon', 'Link') + MERGE_FIELDS:
+        if field in row:
+            row[field] = _master_cell(record, field)
+    return row
+
+
+def merge_into_master_csv(records, path=MASTER_CSV):
+    '''
+    Takes changed records and writes their fields into the matching rows of the
+    master CSV, matched by (Pokedex Number, Variation); every other cell is written
+    back byte for byte. Records whose key has no row (a new variant) are appended
+    with their key, Pokemon, Link (when the record carries one) and fields.
+    The file is replaced atomically
+    Returns the number of rows updated or appended
+    '''
+    master = pd.read_csv(path, dtype=str, keep_default_na=False)
+    variations = row_variations(master.assign(Variation=master['Variation'].where(master['Variation'] != '')))
+    keys = [row_key(dex, variation) for dex, variation in zip(master['Pokedex Number'], variations)]
+    rows_by_key = {}
+    for i, key in enumerate(keys):
+        rows_by_key.setdefault(key, []).append(i)
+
+    updated = 0
+    appended = []
+    for record in records:
+        key = row_key(record['Pokedex Number'], record['Variation'])
+        if key not in rows_by_key:
+            rows_by_key[key] = ()
+            appended.append(_new_master_row(record, master.columns))
+        for i in rows_by_key[key]:
+            for field in MERGE_FIELDS:
+                master.iat[i, master.columns.get_loc(field)] = _master_cell(record, field)
+            updated += 1
+
+    if appended:
+        master = pd.concat([master, pd.DataFrame(appended, columns=master.columns)], ignore_index=True)
+        updated += len(appended)
+    if updated:
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        master.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return updated
+
+
+def refresh_master(df, hashes=None, master_path=MASTER_CSV, cache=None, check_revisions=False,
+                   workers=DEFAULT_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                   timeout=DEFAULT_TIMEOUT):
+    '''
+    Takes a dataframe of rows to keep current (Pokedex Number, Link, Variation, e.g.
+    pokemon_dataset_variations.csv) and brings the master CSV up to date, touching only
+    what changed upstream. With check_revisions=True, pages whose MediaWiki revision
+    id is unchanged are not downloaded at all
+    Hashes are saved only after the merge succeeds, so a failed refresh is retried in full;
+    a page that yielded no records (e.g. it could not be parsed) keeps its old hash, so
+    it is retried on the next refresh as well
+    Returns a summary dict of counts
+    '''
+    hashes = hashes if hashes is not None else HashStore()
+    # Keyed on the whole frame, before the changed rows are picked out of it
+    rows = pd.DataFrame({'Pokedex Number': list(df['Pokedex Number']), 'Link': list(df['Link']),
+                         'Variation': row_variations(df)})
+    links = list(dict.fromkeys(rows['Link']))
+    summary = {'pages': len(links), 'skipped_by_revision': 0, 'fetched': 0,
+               'changed_pages': 0, 'changed_records': 0, 'merged_rows': 0}
+
+    revisions = {}
+    if check_revisions:
+        try:
+            revisions = fetch_revision_ids(links, timeout=timeout)
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            print(f'Could not read revision ids, comparing page content instead: {e}')
+    candidates = [link for link in links if link not in revisions or revisions[link] != hashes.revision(link)]
+    summary['skipped_by_revision'] = len(links) - len(candidates)
+
+    if cache is not None:
+        # A cached copy of a page with a new revision must not be served as fresh
+        for link in candidates:
+            if link in revisions and hashes.revision(link) is not None:
+                cache.expire(link)
+
+    pages = fetch_pages(candidates, workers=workers, requests_per_second=requests_per_second,
+                        timeout=timeout, cache=cache)
+    summary['fetched'] = len(pages)
+
+    page_hashes = {}
+    changed_links = set()
+    for link in candidates:
+        html = pages.get(link)
+        if html is None:
+            continue
+        # Only the infobox: the rest of the page changes on every response
+        digest = content_hash(infobox_html(html) or html)
+        page_hashes[link] = {'sha256': digest, 'revision': revisions.get(link, hashes.revision(link))}
+        if hashes.page_changed(link, digest):
+            changed_links.add(link)
+    summary['changed_pages'] = len(changed_links)
+
+    changed = rows[rows['Link'].isin(changed_links)]
+    links_by_key = {row_key(dex_number, variation): link
+                    for dex_number, link, variation in zip(changed['Pokedex Number'], changed['Link'], changed['Variation'])}
+    extracted_links = set()
+    record_hashes = {}
+    changed_records = []
+    for record in iter_records_from_html(changed, pages, 0, len(changed)):
+        link = links_by_key[row_key(record['Pokedex Number'], record['Variation'])]
+        extracted_links.add(link)
+        key = _record_key(record)
+        digest = record_hash(record)
+        if hashes.records.get(key) != digest and key not in record_hashes:
+            changed_records.append({**record, 'Link': link})
+        record_hashes[key] = digest
+    summary['changed_records'] = len(changed_records)
+
+    for link in changed_links - extracted_links:
+        del page_hashes[link]
+
+    if changed_records:
+        summary['merged_rows'] = merge_into_master_csv(changed_records, master_path)
+
+    hashes.pages.update(page_hashes)
+    hashes.records.update(record_hashes)
+    hashes.save()
+    return summary
+
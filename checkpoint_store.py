@@ -0,0 +1,172 @@
+"""
+Append-only checkpoint store for long scrape runs.
+
+Every finished row is appended to a JSONL file as soon as it is extracted, keyed by
+(Pokedex Number, Variation). A restarted run reads the file back, skips rows that
+already succeeded and retries only the ones that failed or were never reached,
+instead of redoing a whole start/end window after a crash.
+"""
+
+import json
+import os
+import time
+
+from pokemon_fetcher import (
+    DEFAULT_REQUESTS_PER_SECOND,
+    DEFAULT_TIMEOUT,
+    DEFAULT_WORKERS,
+    fetch_pages,
+)
+from pokemon_html_parser import (
+    NO_VARIATION,
+    extract_variant_record,
+    is_base_form,
+    parse_pokemon_page,
+    records_to_columns,
+    row_variations,
+)
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def row_key(dex_number, variation):
+    """
+    Checkpoint key for one dataset row, from its Pokedex Number and the Variation
+    row_variations gives it (so Lycanroc's forms each get their own key)
+    """
+    return int(dex_number), NO_VARIATION if is_base_form(variation) else str(variation)
+
+
+class CheckpointStore:
+    """
+    JSONL checkpoint file. Each line is one attempt at one row; the latest line for a
+    key wins, so a success recorded after a failure marks the row done.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._status = {}
+        self._records = {}
+        self._errors = {}
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A crash can leave a truncated last line behind
+                        continue
+                    self._apply(entry)
+
+    def _apply(self, entry):
+        key = tuple(entry['key'])
+        self._status[key] = entry['status']
+        if entry['status'] == 'ok':
+            self._records[key] = entry['record']
+            self._errors.pop(key, None)
+        else:
+            self._errors[key] = entry.get('error')
+
+    def _append(self, entry):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(entry)
+
+    def is_done(self, dex_number, variation):
+        return self._status.get(row_key(dex_number, variation)) == 'ok'
+
+    @property
+    def completed(self):
+        return {key for key, status in self._status.items() if status == 'ok'}
+
+    @property
+    def failed(self):
+        """Keys whose latest attempt failed, with the error message."""
+        return dict(self._errors)
+
+    def record_success(self, dex_number, variation, record):
+        key = row_key(dex_number, variation)
+        self._append({'key': list(key), 'status': 'ok', 'record': record, 'time': time.time()})
+
+    def write(self, record):
+        """Sink interface (see record_sinks): checkpoint a streamed record by its own keys."""
+        self.record_success(record['Pokedex Number'], record['Variation'], record)
+
+    def record_failure(self, dex_number, variation, error):
+        key = row_key(dex_number, variation)
+        self._append({'key': list(key), 'status': 'failed', 'error': str(error), 'time': time.time()})
+
+    def data_for(self, df, start=0, end=None):
+        '''
+        Returns the dictionary of pokemon data (same shape as get_more_pokemon_data)
+        for the completed rows of a dataframe window, in row order.
+        '''
+        keys = (row_key(dex_number, variation)
+                for dex_number, variation in zip(df['Pokedex Number'][start:end], row_variations(df)[start:end]))
+        return records_to_columns(self._records[key] for key in keys if key in self._records)
+
+
+def get_more_pokemon_data_checkpointed(df, store, start=0, end=None, batch_size=DEFAULT_BATCH_SIZE,
+                                       cache=None, workers=DEFAULT_WORKERS,
+                                       requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                                       timeout=DEFAULT_TIMEOUT):
+    '''
+    Resumable run over a dataframe window. Rows already completed in the checkpoint
+    store are skipped; the rest are fetched and extracted in batches, and each row is
+    written to the store as soon as it is done. Returns the dictionary of pokemon
+    data for every completed row in the window.
+    '''
+    rows = zip(df['Pokedex Number'][start:end], df['Link'][start:end], row_variations(df)[start:end])
+    pending = []
+    seen = set()
+    for dex_number, link, variation in rows:
+        key = row_key(dex_number, variation)
+        if key in seen or store.is_done(dex_number, variation):
+            continue
+        seen.add(key)
+        pending.append((dex_number, link, variation))
+
+    print(f'{len(pending)} rows to process, {len(store.completed)} already done')
+
+    # Batches of about batch_size rows that never split one page's rows
+    batches = []
+    for row in pending:
+        if not batches or (len(batches[-1]) >= batch_size and batches[-1][-1][1] != row[1]):
+            batches.append([])
+        batches[-1].append(row)
+
+    done = 0
+    for batch in batches:
+        pages = fetch_pages([link for _, link, _ in batch], workers=workers,
+                            requests_per_second=requests_per_second, timeout=timeout, cache=cache)
+
+        parsed = {}
+        for dex_number, link, variation in batch:
+            if link not in parsed:
+                try:
+                    if link not in pages:
+                        raise ValueError('page could not be fetched')
+                    parsed[link] = parse_pokemon_page(pages[link])
+                except ValueError as e:
+                    parsed[link] = e
+
+            page = parsed[link]
+            if isinstance(page, Exception):
+                store.record_failure(dex_number, variation, f'{link}: {page}')
+                continue
+            store.record_success(dex_number, variation, extract_variant_record(page, variation))
+
+        done += len(batch)
+        print(f'Checkpointed {done}/{len(pending)} rows')
+
+    if store.failed:
+        print(f'{len(store.failed)} rows failed; run again to retry them')
+
+    return store.data_for(df, start, end)
@@ -0,0 +1,53 @@
+"""
+Shared pytest fixtures
+"""
+
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+import pytest
+
+from saved_pages import HTML_DIR, load_saved_page
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def log_request(self, code='-', size='-'):
+        self.server.responses.append((self.path, int(code)))
+
+
+@pytest.fixture
+def saved_page():
+    """Function returning the HTML of a page in pokemonLinks_html/ by Pokemon name"""
+    return load_saved_page
+
+
+@pytest.fixture
+def local_page_server():
+    """
+    Serve pokemonLinks_html/ over HTTP on a free local port
+    Yields a function mapping a Pokemon name to its page URL; its .responses
+    attribute lists the (path, status code) of every request served
+    """
+    handler = functools.partial(_QuietHandler, directory=HTML_DIR)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.responses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host, port = server.server_address
+
+    def page_url(pokemon):
+        return f'http://{host}:{port}/{quote(pokemon + "_(Pokémon)")}.html'
+
+    page_url.responses = server.responses
+
+    try:
+        yield page_url
+    finally:
+        server.shutdown()
+        server.server_close()
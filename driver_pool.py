@@ -0,0 +1,199 @@
+"""
+Pool of warm Selenium drivers for pages that need a real browser.
+
+Drivers are created lazily up to the pool size and reused across batches instead of
+being closed at the end of every batch. Each driver is health-checked before it is
+handed out and recycled (quit and replaced) when it stops answering, grows past a
+JavaScript heap limit, has served max_pages pages, or raised while in use (e.g. a
+page that hung past its page-load timeout).
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from adaptive_wait import AdaptiveWaits, LatencyTracker, block_unused_resources
+from pokemon_html_parser import extract_variant_records, group_variations_by_link, records_to_columns
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_PAGES = 200
+DEFAULT_PAGE_LOAD_TIMEOUT = 90
+
+_HEAP_SIZE_SCRIPT = (
+    'return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0;'
+)
+
+
+def headless_chrome():
+    """
+    Default driver factory: a headless Chrome instance that returns from get() once
+    the DOM is ready and never downloads images, fonts or ads.
+    """
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--blink-settings=imagesEnabled=false')
+    # The infobox is in the served HTML; there is no need to wait for subresources
+    options.page_load_strategy = 'eager'
+    driver = webdriver.Chrome(options=options)
+    block_unused_resources(driver)
+    return driver
+
+
+class DriverPool:
+    """
+    Thread-safe pool of up to size drivers built by factory.
+    max_memory_mb recycles a driver whose page JS heap grows past it (Chrome only).
+    waits are the adaptive timeouts pages are loaded with; learnt page-load timeouts
+    never exceed page_load_timeout.
+    """
+
+    def __init__(self, factory=headless_chrome, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES,
+                 page_load_timeout=DEFAULT_PAGE_LOAD_TIMEOUT, max_memory_mb=None):
+        if size < 1:
+            raise ValueError('size must be at least 1')
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.page_load_timeout = page_load_timeout
+        self.max_memory_mb = max_memory_mb
+        self.waits = AdaptiveWaits(page_load=LatencyTracker(ceiling=page_load_timeout,
+                                                            floor=min(5, page_load_timeout)))
+
+        # LIFO so the most recently used (warmest) driver is handed out first
+        self._idle = queue.LifoQueue()
+        self._pages = {}
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.recycled = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _create(self):
+        driver = self.factory()
+        driver.set_page_load_timeout(self.page_load_timeout)
+        self._pages[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+            self.recycled += 1
+
+    def is_healthy(self, driver):
+        """One round-trip check that the browser answers and is under the memory limit."""
+        try:
+            heap_size = driver.execute_script(_HEAP_SIZE_SCRIPT) or 0
+        except Exception:
+            return False
+        if self.max_memory_mb is not None and heap_size > self.max_memory_mb * 1024 * 1024:
+            return False
+        return True
+
+    def acquire(self, timeout=None):
+        """
+        Borrow a healthy driver, starting a new one if the pool is not full yet
+        Raises queue.Empty if none becomes free within timeout seconds
+        """
+        if self._closed:
+            raise RuntimeError('DriverPool is closed')
+
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._create()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                driver = self._idle.get(timeout=timeout)
+
+            if self.is_healthy(driver):
+                return driver
+            print('Recycling unresponsive driver')
+            self._discard(driver)
+
+    def release(self, driver, broken=False):
+        """Return a driver after loading one page; broken or worn-out drivers are replaced."""
+        self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+        if broken or self._closed or self._pages[id(driver)] >= self.max_pages:
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Borrow a driver for one page; any exception while in use recycles it."""
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, broken=True)
+            raise
+        self.release(driver)
+
+    def close(self):
+        """Quit every idle driver; drivers still borrowed are quit when released."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+def get_more_pokemon_data_pooled(df, pool, start, end):
+    '''
+    Takes a dataframe, a DriverPool, and start and end index values and returns the
+    same dictionary of pokemon data as get_more_pokemon_data. Pages are loaded on
+    all of the pool's browsers at once, and the drivers stay open for the next batch.
+    A page that times out on every retry recycles the driver that loaded it.
+    '''
+    from final_fixed_get_more_pokemon_data import load_pokemon_page
+
+    groups = group_variations_by_link(df, start, end)
+
+    def load(link):
+        with pool.driver() as driver:
+            return load_pokemon_page(driver, link, waits=pool.waits)
+
+    records = {}
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        futures = {executor.submit(load, link): link for link in groups}
+        for future in as_completed(futures):
+            link = futures[future]
+            try:
+                page = future.result()
+            except Exception as e:
+                print(f'Error loading {link}: {e}')
+                continue
+
+            rows = groups[link]
+            variations = [variation for _, variation in rows]
+            for (position, _), record in zip(rows, extract_variant_records(page, variations)):
+                records[position] = record
+
+    return records_to_columns(records[position] for position in sorted(records))
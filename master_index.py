@@ -0,0 +1,180 @@
+"""
+Indexed queries over the master dataset.
+
+MasterIndex precomputes, once per load, hash indexes (value -> sorted row positions)
+on the categorical columns and sorted arrays on the numeric ones, so an equality
+lookup is a dict hit and a range filter is two binary searches; combined filters
+intersect the (already sorted) position arrays. MasterQuery wraps it around the
+master file with an LRU cache of query results that is dropped whenever the file's
+mtime or size changes.
+
+    master = MasterQuery()
+    fire_sweepers = master.query(equals={'Type': 'Fire'}, ranges={'Speed': (100, None)})
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from master_store import MASTER_CSV, STAT_FIELDS, MasterStore, master_from_csv
+
+HASH_COLUMNS = ('Pokemon', 'Type 1', 'Type 2', 'Generation')
+SORTED_COLUMNS = ('Pokedex Number',) + STAT_FIELDS + ('Height (m)', 'Weight (kg)')
+
+# Virtual column: a row matches 'Type' if either of its types does
+EITHER_TYPE = 'Type'
+
+DEFAULT_CACHE_SIZE = 256
+
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+def _key(value):
+    """Hash index key: strings match case-insensitively, numbers by value (1 == 1.0)"""
+    return value.casefold() if isinstance(value, str) else value
+
+
+def _values(value):
+    """A scalar or a collection of accepted values, as a tuple"""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value)
+    return (value,)
+
+
+class MasterIndex:
+    """Hash and sorted-array indexes over one loaded master frame."""
+
+    def __init__(self, frame, hash_columns=HASH_COLUMNS, sorted_columns=SORTED_COLUMNS):
+        self.frame = frame.reset_index(drop=True)
+        self.hashed = {}
+        self.sorted = {}
+
+        for column in hash_columns:
+            if column not in self.frame:
+                continue
+            index = {}
+            for value, positions in self.frame.groupby(column, sort=False).indices.items():
+                key = _key(value)
+                index[key] = np.union1d(index[key], positions) if key in index else np.sort(positions)
+            self.hashed[column] = index
+
+        for column in sorted_columns:
+            if column not in self.frame:
+                continue
+            values = self.frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            # NaN sorts last, so searches over the finite prefix never see it
+            order = np.argsort(values, kind='stable')
+            finite = int(np.count_nonzero(~np.isnan(values)))
+            self.sorted[column] = (values[order][:finite], order[:finite])
+
+    def equal(self, column, value):
+        """Sorted positions of rows whose column equals value (or any of several values)"""
+        if column == EITHER_TYPE:
+            return np.union1d(self.equal('Type 1', value), self.equal('Type 2', value))
+        index = self.hashed[column]
+        matches = [index.get(_key(v), _EMPTY) for v in _values(value)]
+        if len(matches) == 1:
+            return matches[0]
+        return np.unique(np.concatenate(matches))
+
+    def between(self, column, low=None, high=None):
+        """Sorted positions of rows with low <= column <= high (either bound may be None)"""
+        values, order = self.sorted[column]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return np.sort(order[start:stop])
+
+    def positions(self, equals=None, ranges=None):
+        """Row positions matching every equality and range filter"""
+        selections = [self.equal(column, value) for column, value in (equals or {}).items()]
+        selections += [self.between(column, *bounds) for column, bounds in (ranges or {}).items()]
+        if not selections:
+            return np.arange(len(self.frame))
+
+        # Intersect smallest first so later steps stay cheap
+        selections.sort(key=len)
+        result = selections[0]
+        for selection in selections[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, selection, assume_unique=True)
+        return result
+
+
+def _cache_key(equals, ranges):
+    equal_key = tuple(sorted((column, tuple(_key(v) for v in _values(value)))
+                             for column, value in (equals or {}).items()))
+    range_key = tuple(sorted((column, tuple(bounds)) for column, bounds in (ranges or {}).items()))
+    return equal_key, range_key
+
+
+class MasterQuery:
+    """
+    Query API over the master file (the MASTER CSV, or a MasterStore Parquet file).
+    The index is built on first use and rebuilt, with the result cache cleared,
+    whenever the file's mtime or size changes.
+    """
+
+    def __init__(self, path=MASTER_CSV, cache_size=DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._index = None
+        self._signature = None
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if self.path.endswith('.parquet'):
+            return MasterStore(self.path).load()
+        return master_from_csv(self.path)
+
+    @property
+    def index(self):
+        """The current MasterIndex, reloaded if the master file changed"""
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            self._index = MasterIndex(self._load())
+            self._signature = signature
+            self._cache.clear()
+        return self._index
+
+    def _entry(self, equals, ranges):
+        """Cache entry [positions, result frame or None] for a query"""
+        index = self.index
+        key = _cache_key(equals, ranges)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = self._cache[key] = [index.positions(equals, ranges), None]
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return entry
+
+    def positions(self, equals=None, ranges=None):
+        """Sorted row positions matching the filters (see query)"""
+        return self._entry(equals, ranges)[0]
+
+    def query(self, equals=None, ranges=None, columns=None):
+        '''
+        Rows matching every filter, e.g.
+        query(equals={'Type': 'Fire', 'Generation': [1, 2]}, ranges={'Attack': (100, None)})
+        equals values may be a single value or a list of accepted values; string
+        matches ignore case. ranges are inclusive (low, high) pairs, None for open ends.
+        Returns a new DataFrame (optionally only some columns)
+        '''
+        entry = self._entry(equals, ranges)
+        if entry[1] is None:
+            entry[1] = self.index.frame.iloc[entry[0]]
+        rows = entry[1]
+        return rows[list(columns)] if columns is not None else rows.copy()
+
+    def lookup(self, pokemon):
+        """Every row (base form and variants) of a Pokemon, by name"""
+        return self.query(equals={'Pokemon': pokemon})
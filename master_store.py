@@ -0,0 +1,171 @@
+"""
+Columnar master dataset keyed by (Pokedex Number, Variation).
+
+Replaces the four positionally-joined CSVs with one Parquet file (requires pyarrow).
+A scrape run upserts only the rows it produced: existing keys get the supplied
+columns overwritten, new keys are appended, and the file is rewritten (atomically)
+only when something actually changed. Loads are memory-mapped and column-pruned, so
+a reader that wants the stats columns never decodes Link or Category text.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from pokemon_html_parser import KEY_FIELDS, NO_VARIATION, is_base_form, row_variations
+from typed_output import UNIT_PATTERNS, parse_measure
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_MASTER_PATH = os.path.join(DATA_DIR, 'pokemon_dataset_MASTER.parquet')
+MASTER_CSV = os.path.join(DATA_DIR, 'pokemon_dataset_MASTER.csv')
+
+STAT_FIELDS = ('HP', 'Attack', 'Defense', 'Speed', 'Special Attack', 'Special Defense', 'Stat Total')
+
+
+def _measure(values, pattern):
+    """Heights/weights as float32 whether they arrive as numbers, '0.7' or '0.7 m'"""
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+    parsed = parse_measure(values, pattern)
+    return np.where(np.isnan(numbers), parsed, numbers).astype(np.float32)
+
+
+def normalize_frame(data):
+    """
+    Bring a frame (or list of records) into the master schema: base-form variations
+    spelled NO_VARIATION, Pokedex Number as int16, stats as Int16, sizes as float32
+    and text as plain strings. Raises ValueError on missing or duplicate keys.
+    """
+    frame = pd.DataFrame(data).reset_index(drop=True)
+    missing = [name for name in KEY_FIELDS if name not in frame]
+    if missing:
+        raise ValueError(f'rows are missing key columns: {missing}')
+
+    frame['Pokedex Number'] = pd.to_numeric(frame['Pokedex Number']).astype(np.int16)
+    frame['Variation'] = [NO_VARIATION if is_base_form(v) else str(v) for v in frame['Variation']]
+    for column in STAT_FIELDS:
+        if column in frame:
+            frame[column] = pd.to_numeric(frame[column]).astype('Int16')
+    for column, pattern in UNIT_PATTERNS.items():
+        if column in frame:
+            frame[column] = _measure(frame[column], pattern)
+    for column in frame.columns:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].astype(object).where(frame[column].notna(), None)
+
+    duplicated = frame.duplicated(list(KEY_FIELDS), keep=False)
+    if duplicated.any():
+        keys = frame.loc[duplicated, list(KEY_FIELDS)].drop_duplicates().to_records(index=False).tolist()
+        raise ValueError(f'duplicate (Pokedex Number, Variation) keys: {keys}')
+    return frame
+
+
+def master_from_csv(path=MASTER_CSV):
+    '''
+    One-off import of the joined MASTER CSV into the master schema
+    Forms that the CSV lists as separate rows without a Variation (Lycanroc, Wishiwashi,
+    Minior, ...) have their own stats, so they are keyed by their row name instead,
+    the same key the record producers give them (see row_variations)
+    '''
+    frame = pd.read_csv(path)
+    frame['Variation'] = row_variations(frame)
+    return normalize_frame(frame)
+
+
+def _same(old, new):
+    """Element-wise equality where two missing values count as equal"""
+    old, new = old.reset_index(drop=True), new.reset_index(drop=True)
+    return (old == new).fillna(False).to_numpy(dtype=bool) | (old.isna() & new.isna()).to_numpy()
+
+
+class MasterStore:
+    """The master dataset as a single Parquet file."""
+
+    def __init__(self, path=DEFAULT_MASTER_PATH):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def columns(self):
+        """Column names from the file footer, without reading any data"""
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(self.path).names
+
+    def load(self, columns=None, filters=None, keys=True):
+        '''
+        Reads the master dataset memory-mapped. Only the requested columns are
+        decoded (plus the key columns unless keys=False); filters are passed to
+        pyarrow, e.g. [('Generation', '=', 1)]
+        '''
+        import pyarrow.parquet as pq
+
+        if columns is not None:
+            columns = list(columns)
+            if keys:
+                columns = [name for name in KEY_FIELDS if name not in columns] + columns
+        table = pq.read_table(self.path, columns=columns, filters=filters, memory_map=True)
+        return table.to_pandas()
+
+    def write(self, frame):
+        """Replace the whole dataset (sorted by key), atomically"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frame = normalize_frame(frame).sort_values(list(KEY_FIELDS), kind='stable')
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def upsert(self, rows):
+        '''
+        Takes the rows a scrape run produced (a DataFrame or an iterable of records,
+        e.g. from iter_records_from_html) and merges them in by key. Only the columns
+        present in rows are overwritten; other columns of existing rows are kept
+        Returns counts of inserted, updated and unchanged rows
+        '''
+        if not isinstance(rows, pd.DataFrame):
+            rows = list(rows)
+        updates = normalize_frame(rows)
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if updates.empty:
+            return counts
+
+        if not self.exists():
+            self.write(updates)
+            counts['inserted'] = len(updates)
+            return counts
+
+        master = self.load().set_index(list(KEY_FIELDS))
+        updates = updates.set_index(list(KEY_FIELDS))
+        known = updates.index.isin(master.index)
+
+        changed = np.zeros(len(updates), dtype=bool)
+        for column in updates.columns:
+            if column not in master:
+                changed |= known & updates[column].notna().to_numpy()
+                continue
+            old = master[column].reindex(updates.index)
+            changed |= known & ~_same(old, updates[column])
+
+        counts['inserted'] = int((~known).sum())
+        counts['updated'] = int(changed.sum())
+        counts['unchanged'] = int(known.sum()) - counts['updated']
+        if not counts['inserted'] and not counts['updated']:
+            return counts
+
+        for column in updates.columns:
+            if column not in master:
+                master[column] = updates[column].iloc[:0].reindex(master.index)
+        modified = updates[known & changed]
+        master.loc[modified.index, modified.columns] = modified
+
+        merged = pd.concat([master, updates[~known]])
+        self.write(merged.reset_index())
+        return counts
@@ -0,0 +1,151 @@
+"""
+Persistent on-disk cache for fetched Bulbapedia pages.
+
+Pages are stored gzip-compressed under a name derived from the SHA-256 of their URL,
+with a small JSON sidecar holding the validators (ETag / Last-Modified) and fetch
+time. Entries older than the TTL are revalidated with a conditional request, and
+the least recently used entries are evicted once the cache grows past max_bytes.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'page_cache')
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    """A cached page and the validators needed to revalidate it."""
+    url: str
+    html: str
+    etag: object = None
+    last_modified: object = None
+    fetched_at: float = 0.0
+    fresh: bool = False
+
+
+class PageCache:
+    """
+    Content-addressed page cache keyed by URL.
+    ttl is in seconds (None never expires); max_bytes bounds the compressed size on disk.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, url):
+        key = self.key(url)
+        folder = os.path.join(self.directory, key[:2])
+        return os.path.join(folder, key + '.html.gz'), os.path.join(folder, key + '.json')
+
+    def get(self, url):
+        """
+        Look up a cached page
+        Returns a CacheEntry (fresh or stale) or None if the URL was never cached
+        """
+        page_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with gzip.open(page_path, 'rt', encoding='utf-8', newline='') as f:
+                html = f.read()
+        except (OSError, ValueError):
+            return None
+
+        # The page file's mtime is the LRU clock
+        os.utime(page_path)
+
+        fetched_at = meta.get('fetched_at', 0.0)
+        fresh = self.ttl is None or time.time() - fetched_at < self.ttl
+        return CacheEntry(url=url, html=html, etag=meta.get('etag'),
+                          last_modified=meta.get('last_modified'), fetched_at=fetched_at, fresh=fresh)
+
+    def put(self, url, html, etag=None, last_modified=None):
+        """Store a freshly downloaded page with its validators."""
+        page_path, meta_path = self._paths(url)
+        os.makedirs(os.path.dirname(page_path), exist_ok=True)
+
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'fetched_at': time.time()}
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        with gzip.open(page_path + suffix, 'wt', encoding='utf-8', newline='') as f:
+            f.write(html)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(page_path + suffix, page_path)
+        os.replace(meta_path + suffix, meta_path)
+
+    def touch(self, url):
+        """Mark a cached page as fresh again after the server answered 304 Not Modified."""
+        self._set_fetched_at(url, time.time())
+
+    def expire(self, url):
+        """Mark a cached page as stale so the next fetch revalidates it (e.g. after a new revision)."""
+        self._set_fetched_at(url, 0.0)
+
+    def _set_fetched_at(self, url, fetched_at):
+        _, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        meta['fetched_at'] = fetched_at
+        tmp_path = f'{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _entries(self):
+        """(mtime, size, page path) for every cached page."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.html.gz'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """Total compressed size of the cached pages in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        Remove least recently used pages until the cache fits in max_bytes
+        Returns the number of pages removed
+        """
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, page_path in entries:
+                if total <= self.max_bytes:
+                    break
+                meta_path = page_path[:-len('.html.gz')] + '.json'
+                for path in (page_path, meta_path):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                removed += 1
+            return removed
@@ -0,0 +1,151 @@
+"""
+Concurrent page fetcher for Bulbapedia species pages.
+
+Downloads page HTML with a bounded thread pool while keeping every host under a
+requests-per-second cap, then hands the pages to the offline parser
+(pokemon_html_parser) instead of driving one browser through the links one by one.
+An optional PageCache (page_cache) keeps pages on disk between runs.
+"""
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from pokemon_html_parser import get_more_pokemon_data_from_html
+
+USER_AGENT = 'PokesProject/1.0 (+https://github.com/wanderduck/PokesProject)'
+
+DEFAULT_WORKERS = 8
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_TIMEOUT = 30
+
+
+class HostRateLimiter:
+    """
+    Spaces out requests to the same host so that no host sees more than
+    requests_per_second. Safe to share between worker threads.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+        if requests_per_second <= 0:
+            raise ValueError('requests_per_second must be positive')
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until the next request slot for this URL's host is reached."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _download(url, timeout, headers=None):
+    """Plain GET; returns (html, response headers)."""
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT, **(headers or {})})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or 'utf-8'
+        return response.read().decode(charset, errors='replace'), response.headers
+
+
+def fetch_page(url, timeout=DEFAULT_TIMEOUT, cache=None):
+    """
+    Download one page and return its decoded HTML
+    With a PageCache, stale entries are revalidated with If-None-Match /
+    If-Modified-Since and a 304 answer is served from disk
+    Raises urllib.error.URLError (including HTTPError) on failure
+    """
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and entry.fresh:
+        return entry.html
+
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+
+    try:
+        html, response_headers = _download(url, timeout, headers)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and entry is not None:
+            cache.touch(url)
+            return entry.html
+        raise
+
+    if cache is not None:
+        cache.put(url, html, etag=response_headers.get('ETag'),
+                  last_modified=response_headers.get('Last-Modified'))
+    return html
+
+
+def fetch_pages(urls, workers=DEFAULT_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                timeout=DEFAULT_TIMEOUT, cache=None, offline=False):
+    """
+    Download many pages concurrently under a per-host rate limit
+    Duplicate URLs are fetched once; failed URLs are reported and left out
+    Fresh cache hits skip the network and the rate limit; with offline=True every
+    page comes from the cache (stale or not) and uncached URLs are reported missing
+    Returns a dict of url -> HTML
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    limiter = HostRateLimiter(requests_per_second)
+    pages = {}
+
+    if cache is not None:
+        pending = []
+        for url in unique_urls:
+            entry = cache.get(url)
+            if entry is not None and (entry.fresh or offline):
+                pages[url] = entry.html
+            else:
+                pending.append(url)
+        unique_urls = pending
+
+    if offline:
+        for url in unique_urls:
+            print(f'Not in cache: {url}')
+        return pages
+
+    def fetch(url):
+        limiter.wait(url)
+        return fetch_page(url, timeout=timeout, cache=cache)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(fetch, url): url for url in unique_urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                pages[url] = future.result()
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                print(f'Failed to fetch {url}: {e}')
+
+    if cache is not None:
+        cache.evict()
+
+    return pages
+
+
+def get_more_pokemon_data_concurrent(df, start, end, workers=DEFAULT_WORKERS,
+                                     requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                                     timeout=DEFAULT_TIMEOUT, cache=None, offline=False):
+    '''
+    Takes a dataframe and start and end index values and returns the same dictionary
+    of pokemon data as get_more_pokemon_data, fetching pages concurrently over HTTP
+    instead of through a browser. Pass a PageCache to reuse pages between runs, and
+    offline=True to re-extract from the cache without touching the network.
+    '''
+    pages = fetch_pages(df['Link'][start:end], workers=workers,
+                        requests_per_second=requests_per_second, timeout=timeout,
+                        cache=cache, offline=offline)
+    print(f'Fetched {len(pages)} pages')
+    return get_more_pokemon_data_from_html(df, pages, start, end)
@@ -0,0 +1,501 @@
+"""
+Offline parser for Bulbapedia Pokemon species pages.
+
+Takes the raw HTML of a page once (driver.page_source, a downloaded page or one of
+the files saved in pokemonLinks_html/) and extracts the infobox fields used by
+get_more_pokemon_data in-process, instead of one WebDriver round-trip per element.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+from scrape_metrics import NULL_METRICS
+from variant_matcher import VariantMatcher
+
+NO_VARIATION = 'No Variation'
+
+RECORD_FIELDS = ('Pokemon', 'Category', 'Type 1', 'Type 2', 'Height (m)', 'Weight (kg)')
+
+# Row keys carried by streamed records (see iter_records_from_html)
+KEY_FIELDS = ('Pokedex Number', 'Variation')
+
+_VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+})
+
+_WHITESPACE = re.compile(r'\s+')
+
+_DEX_NUMBER = re.compile(r'#(\d+)')
+
+_TABLE_TAG = re.compile(r'<(/?)table\b', re.IGNORECASE)
+
+
+class _Node:
+    """Minimal element node: tag, attributes, and child nodes / text strings."""
+
+    __slots__ = ('tag', 'attrs', 'children', 'parent')
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+
+    @property
+    def hidden(self):
+        style = (self.attrs.get('style') or '').replace(' ', '').lower()
+        return 'display:none' in style
+
+    def elements(self, tag=None):
+        """Direct element children, optionally filtered by tag."""
+        return [c for c in self.children
+                if isinstance(c, _Node) and (tag is None or c.tag == tag)]
+
+    def iter(self, tag=None):
+        """All descendant elements in document order, optionally filtered by tag."""
+        for child in self.children:
+            if isinstance(child, _Node):
+                if tag is None or child.tag == tag:
+                    yield child
+                yield from child.iter(tag)
+
+    def find(self, tag):
+        return next(self.iter(tag), None)
+
+    def text(self, visible_only=True):
+        """Text with whitespace collapsed; by default only visible text, like WebElement.text."""
+        parts = []
+        self._collect_text(parts, visible_only)
+        return _WHITESPACE.sub(' ', ''.join(parts).replace('\xa0', ' ')).strip()
+
+    def _collect_text(self, parts, visible_only):
+        if visible_only and self.hidden:
+            return
+        for child in self.children:
+            if isinstance(child, _Node):
+                if child.tag == 'br':
+                    parts.append(' ')
+                else:
+                    child._collect_text(parts, visible_only)
+            else:
+                parts.append(child)
+
+
+class _InfoboxComplete(Exception):
+    """Raised by the tree builder once the infobox table has been closed."""
+
+
+class _InfoboxTreeBuilder(HTMLParser):
+    """Builds a _Node tree for the first element fed to it and stops when it closes."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = None
+        self._stack = []
+
+    def handle_starttag(self, tag, attrs):
+        parent = self._stack[-1] if self._stack else None
+        node = _Node(tag, dict(attrs), parent)
+        if parent is None:
+            self.root = node
+        else:
+            parent.children.append(node)
+        if tag not in _VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        if self._stack:
+            self._stack[-1].children.append(_Node(tag, dict(attrs), self._stack[-1]))
+
+    def handle_endtag(self, tag):
+        # Pop back to the matching open tag; stray end tags are ignored
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i].tag == tag:
+                del self._stack[i:]
+                break
+        if self.root is not None and not self._stack:
+            raise _InfoboxComplete
+
+    def handle_data(self, data):
+        if self._stack:
+            self._stack[-1].children.append(data)
+
+
+@dataclass
+class TypeColumn:
+    """One column of the infobox Type(s) table: a form label and its types."""
+    label: str
+    type1: object = None
+    type2: object = None
+    hidden: bool = False
+
+
+@dataclass
+class SizeTable:
+    """
+    Height and weight for every variant on a page, built in one pass over both tables.
+    by_label maps each visible variant label to [height, weight]; shared holds the
+    first-row values, which hidden rows mean every form shares.
+    """
+    labels: list = field(default_factory=list)
+    by_label: dict = field(default_factory=dict)
+    base: list = field(default_factory=lambda: [None, None])
+    shared: list = field(default_factory=lambda: [None, None])
+
+    def _fill(self, values):
+        return tuple(value if value is not None else self.shared[i] for i, value in enumerate(values))
+
+    def base_sizes(self, pokemon_name):
+        """(height, weight) of the base form."""
+        named = self.by_label.get(pokemon_name, [None, None])
+        return self._fill(base if base is not None else named[i] for i, base in enumerate(self.base))
+
+    def lookup(self, variant, matcher, pokemon_name, metrics=NULL_METRICS):
+        """(height, weight) for a variant; matcher indexes this table's labels."""
+        if is_base_form(variant):
+            return self.base_sizes(pokemon_name)
+        index = matcher.match(variant)
+        if index is None:
+            metrics.count('sizes.fallback')
+            return tuple(self.shared)
+        return self._fill(self.by_label[self.labels[index]])
+
+
+@dataclass
+class PokemonPage:
+    """Infobox fields parsed from one species page."""
+    name: object = None
+    category: object = None
+    dex_number: object = None
+    types: list = field(default_factory=list)
+    sizes: SizeTable = field(default_factory=SizeTable)
+    _matchers: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def matcher(self, table):
+        """VariantMatcher over the labels of 'types' or 'sizes', built once per page."""
+        if table not in self._matchers:
+            if table == 'types':
+                labels = [column.label for column in self.types]
+            else:
+                labels = self.sizes.labels
+            self._matchers[table] = VariantMatcher(labels, self.name)
+        return self._matchers[table]
+
+    def variant_types(self, variant, metrics=NULL_METRICS):
+        """(type1, type2) of a variant, falling back to the base form's types."""
+        return _pick_types(self.types, self.matcher('types'), variant, metrics)
+
+    def variant_sizes(self, variant, metrics=NULL_METRICS):
+        """(height, weight) of a variant, falling back to the sizes every form shares."""
+        return self.sizes.lookup(variant, self.matcher('sizes'), self.name, metrics)
+
+
+def _rows(table):
+    """Direct <tr> rows of a table, looking through <thead>/<tbody> when present."""
+    rows = []
+    for child in table.elements():
+        if child.tag == 'tr':
+            rows.append(child)
+        elif child.tag in ('thead', 'tbody', 'tfoot'):
+            rows.extend(child.elements('tr'))
+    return rows
+
+
+_SECTIONS = {'Type': 'types', 'Types': 'types', 'Height': 'height', 'Weight': 'weight'}
+
+
+def _section_tables(infobox):
+    """
+    Find the tables that follow the bold 'Type(s)', 'Height' and 'Weight' labels
+    in one traversal of the infobox
+    Returns a dict of section -> table node; missing sections are left out
+    """
+    tables = {}
+    for cell in infobox.iter('td'):
+        for bold in cell.elements('b'):
+            section = _SECTIONS.get(bold.text())
+            if section is None or section in tables:
+                continue
+            table = next(iter(cell.elements('table')), None)
+            if table is not None:
+                tables[section] = table
+        if len(tables) == len(set(_SECTIONS.values())):
+            break
+    return tables
+
+
+def _parse_types(table):
+    columns = []
+    for row in _rows(table):
+        for cell in row.elements('td'):
+            hidden = row.hidden or cell.hidden
+            small = next(iter(cell.elements('small')), None)
+            label = small.text() if small is not None and not hidden else ''
+
+            names = []
+            inner = cell.find('table')
+            if inner is not None:
+                inner_rows = _rows(inner)
+                for type_cell in (inner_rows[0].elements('td') if inner_rows else []):
+                    bold = type_cell.find('b')
+                    if type_cell.hidden or bold is None or not bold.text():
+                        names.append(None)
+                    else:
+                        names.append(bold.text())
+
+            columns.append(TypeColumn(
+                label=label,
+                type1=names[0] if len(names) > 0 else None,
+                type2=names[1] if len(names) > 1 else None,
+                hidden=hidden,
+            ))
+    return columns
+
+
+def _parse_sizes(height_table, weight_table):
+    sizes = SizeTable()
+    for column, table in enumerate((height_table, weight_table)):
+        if table is None:
+            continue
+        rows = _rows(table)
+        # Rows come in pairs: value row (imperial, metric) then name row
+        for i in range(0, len(rows) - 1, 2):
+            value_row, name_row = rows[i], rows[i + 1]
+            cells = value_row.elements('td')
+            # Keep the text of hidden rows too; the first one is the shared value
+            value = (cells[1].text(visible_only=False) or None) if len(cells) >= 2 else None
+            hidden = value_row.hidden or name_row.hidden
+
+            if i == 0:
+                sizes.shared[column] = value
+                if not hidden:
+                    sizes.base[column] = value
+            if hidden:
+                continue
+
+            label = name_row.text()
+            if not label:
+                continue
+            if label not in sizes.by_label:
+                sizes.by_label[label] = [None, None]
+                sizes.labels.append(label)
+            if sizes.by_label[label][column] is None:
+                sizes.by_label[label][column] = value
+    return sizes
+
+
+def _infobox_start(html):
+    """Offset of the infobox's <table> tag, or -1"""
+    marker = html.find('class="roundy infobox"')
+    if marker == -1:
+        return -1
+    return html.rfind('<table', 0, marker)
+
+
+def infobox_html(html):
+    """
+    The raw HTML of a species page's infobox table (everything parse_pokemon_page reads),
+    or None if the page has no infobox. Unlike the whole page, it does not change with
+    every response (request ids, cache timestamps)
+    """
+    start = _infobox_start(html)
+    if start == -1:
+        return None
+    depth = 0
+    for match in _TABLE_TAG.finditer(html, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            end = html.find('>', match.end())
+            return html[start:] if end == -1 else html[start:end + 1]
+    return html[start:]
+
+
+def parse_pokemon_page(html):
+    """
+    Parse the infobox of a Bulbapedia species page from its raw HTML
+    Returns a PokemonPage; raises ValueError if the page has no infobox
+    """
+    start = _infobox_start(html)
+    if start == -1:
+        raise ValueError('No Pokemon infobox found in page')
+
+    builder = _InfoboxTreeBuilder()
+    try:
+        builder.feed(html[start:])
+    except _InfoboxComplete:
+        pass
+    infobox = builder.root
+
+    page = PokemonPage()
+
+    for big in infobox.iter('big'):
+        bold = big.find('b')
+        if big.parent is not None and big.parent.tag == 'big' and bold is not None:
+            page.name = bold.text() or None
+            break
+
+    for link in infobox.iter('a'):
+        title = link.attrs.get('title', '')
+        if page.category is None and title == 'Pokémon category':
+            page.category = link.text() or None
+        elif page.dex_number is None and 'National Pokédex number' in title:
+            match = _DEX_NUMBER.search(link.text())
+            if match:
+                page.dex_number = int(match.group(1))
+
+    tables = _section_tables(infobox)
+    if 'types' in tables:
+        page.types = _parse_types(tables['types'])
+    page.sizes = _parse_sizes(tables.get('height'), tables.get('weight'))
+
+    return page
+
+
+def is_base_form(variant):
+    """True for the base form marker: 'No Variation' or a missing (None/NaN) value."""
+    return variant is None or variant != variant or variant == NO_VARIATION
+
+
+def row_variations(df):
+    """
+    The Variation each row of df is keyed by: its own Variation, except that base-form
+    rows sharing a Pokedex Number with another base-form row (Lycanroc's Midday, Midnight
+    and Dusk forms, Minior, Palafin, ...) are keyed by their Pokemon name, so every row
+    has its own (Pokedex Number, Variation). Works on whole frames, not batches, so a
+    batch boundary never changes a key; without a Pokemon column nothing is renamed
+    """
+    variations = list(df['Variation'])
+    if 'Pokemon' not in df or 'Pokedex Number' not in df:
+        return variations
+    shared = Counter(dex for dex, variation in zip(df['Pokedex Number'], variations) if is_base_form(variation))
+    return [name if is_base_form(variation) and shared[dex] > 1 else variation
+            for dex, name, variation in zip(df['Pokedex Number'], df['Pokemon'], variations)]
+
+
+def _pick_types(columns, matcher, variant, metrics=NULL_METRICS):
+    """Return (type1, type2) for a variant from parsed type columns."""
+    if not columns:
+        return None, None
+
+    column = columns[0]
+    if not is_base_form(variant):
+        index = matcher.match(variant)
+        if index is None:
+            metrics.count('types.fallback')
+            if any(c.label for c in columns):
+                print(f"  Warning: Could not find exact match for variant '{variant}', using fallback")
+            # Index 0 is the base form; use the first variant after it when it is shown
+            index = 1 if len(columns) > 1 and not columns[1].hidden else 0
+        if columns[index].type1 is not None:
+            column = columns[index]
+
+    return column.type1, column.type2
+
+
+def extract_variant_record(page, variant, metrics=NULL_METRICS):
+    """
+    Build one output record for a variant from a parsed page
+    Missing values are NaN, matching get_more_pokemon_data
+    metrics (see scrape_metrics) times the types and sizes stages and counts fallbacks
+    """
+    nan = float('nan')
+    with metrics.stage('types'):
+        type1, type2 = page.variant_types(variant, metrics)
+    with metrics.stage('sizes'):
+        height, weight = page.variant_sizes(variant, metrics)
+
+    metrics.count('records')
+    for name, value in (('category', page.category), ('height', height), ('weight', weight)):
+        if not value:
+            metrics.count(f'{name}.missing')
+
+    return {
+        'Pokemon': page.name if page.name else nan,
+        'Category': page.category if page.category else nan,
+        'Type 1': type1 if type1 else nan,
+        'Type 2': type2 if type2 else nan,
+        'Height (m)': height if height else nan,
+        'Weight (kg)': weight if weight else nan,
+    }
+
+
+def extract_variant_records(page, variants):
+    """
+    Resolve several variants of one species from a single parsed page
+    The page's label matchers are built on first use and shared by every variant
+    Returns one record per variant, in the order given
+    """
+    return [extract_variant_record(page, variant) for variant in variants]
+
+
+def records_to_columns(records):
+    """Turn an iterable of records into the dict of column lists returned by get_more_pokemon_data"""
+    data = {name: [] for name in RECORD_FIELDS}
+    for record in records:
+        for name in RECORD_FIELDS:
+            data[name].append(record[name])
+    return data
+
+
+def group_variations_by_link(df, start, end):
+    """
+    Group the rows of a batch by their page link
+    Returns a dict of link -> list of (row position, variation), links in first-seen order
+    """
+    groups = {}
+    rows = zip(df['Link'][start:end], row_variations(df)[start:end])
+    for position, (link, variation) in enumerate(rows):
+        groups.setdefault(link, []).append((position, variation))
+    return groups
+
+
+def _batch_rows(df, start, end):
+    """(Pokedex Number or None, Link, Variation) for each row of a batch"""
+    links = df['Link'][start:end]
+    dex_numbers = df['Pokedex Number'][start:end] if 'Pokedex Number' in df else [None] * len(links)
+    return zip(dex_numbers, links, row_variations(df)[start:end])
+
+
+def iter_records_from_html(df, pages, start, end, metrics=NULL_METRICS):
+    """
+    Stream one complete record per row of a batch, in row order, as soon as it is extracted
+    Records carry the row's Pokedex Number and Variation next to the RECORD_FIELDS
+    Each page is parsed once; rows whose page is missing or unparsable are reported and skipped
+    """
+    parsed = {}
+
+    for dex_number, link, variation in _batch_rows(df, start, end):
+        metrics.count('rows')
+        if link not in parsed:
+            html = pages.get(link)
+            if html is None:
+                print(f'No page HTML for {link}')
+                metrics.count('pages.missing')
+                parsed[link] = None
+            else:
+                try:
+                    with metrics.stage('parse'):
+                        parsed[link] = parse_pokemon_page(html)
+                except ValueError as e:
+                    print(f'Could not parse {link}: {e}')
+                    parsed[link] = None
+
+        page = parsed[link]
+        if page is None:
+            metrics.count('rows.failed')
+            continue
+        record = extract_variant_record(page, variation, metrics)
+        yield {'Pokedex Number': dex_number, 'Variation': variation, **record}
+
+
+def get_more_pokemon_data_from_html(df, pages, start, end):
+    '''
+    Offline counterpart of get_more_pokemon_data.
+    Takes a dataframe, a mapping of Link -> page HTML, and start and end index values
+    and returns the same dictionary of pokemon data without a browser.
+    Each page is parsed once and every variation that links to it is resolved from it.
+    '''
+    return records_to_columns(iter_records_from_html(df, pages, start, end))
@@ -0,0 +1,285 @@
+"""
+Command-line entry point for the scraping pipeline, meant to run unattended (cron).
+
+    python pokes_cli.py fetch                       download species pages into the page cache
+    python pokes_cli.py fetch --offline             report which pages are cached, no network
+    python pokes_cli.py extract --csv out.csv       records from cached pages (or --corpus DIR)
+    python pokes_cli.py extract --master data/pokemon_dataset_MASTER.parquet
+    python pokes_cli.py refresh --check-revisions   bring the MASTER CSV up to date
+    python pokes_cli.py scrape --checkpoint data/scrape.jsonl --csv out.csv
+    python pokes_cli.py bench -- --repeat 200       extraction benchmark (benchmark_extraction)
+
+Only argparse and os are imported up front; each subcommand imports what it needs, so
+fetch and extract never load pandas, numpy or selenium, and only scrape starts a
+(headless) browser. Rows are read from the variations CSV (Pokedex Number, Link,
+Variation) with the csv module. Default paths are relative to this file, not to the
+working directory. Every subcommand except bench holds an exclusive lock file, so an
+overlapping cron run exits with status 75 instead of racing the one in progress.
+Exit status is 0 on success and 1 when pages or rows failed.
+"""
+
+import argparse
+import os
+import sys
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_ROWS = os.path.join(DATA_DIR, 'pokemon_dataset_variations.csv')
+DEFAULT_MASTER_CSV = os.path.join(DATA_DIR, 'pokemon_dataset_MASTER.csv')
+DEFAULT_HASH_PATH = os.path.join(DATA_DIR, 'content_hashes.json')
+DEFAULT_LOCK_PATH = os.path.join(DATA_DIR, 'pokes_cli.lock')
+
+# sysexits.h EX_TEMPFAIL: another run holds the lock, try again later
+EXIT_LOCKED = 75
+
+
+def load_rows(path=DEFAULT_ROWS, start=0, end=None):
+    '''
+    Reads the rows to process (Pokedex Number, Link, Variation) from a CSV without pandas
+    Returns a dict of column -> list, which the record generators accept like a DataFrame.
+    Variations are already keyed (see row_variations) over the whole file, so a batch
+    boundary never changes a key; empty Variation cells become None (the base form)
+    '''
+    import csv
+
+    from pokemon_html_parser import row_variations
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    columns = {
+        'Pokedex Number': [int(row['Pokedex Number']) for row in rows],
+        'Link': [row['Link'] for row in rows],
+        'Variation': [row.get('Variation') or None for row in rows],
+    }
+    if rows and 'Pokemon' in rows[0]:
+        columns['Variation'] = row_variations({**columns, 'Pokemon': [row['Pokemon'] for row in rows]})
+    return {name: values[start:end] for name, values in columns.items()}
+
+
+def _page_cache(args):
+    from page_cache import DEFAULT_CACHE_DIR, PageCache
+
+    return PageCache(args.cache_dir or DEFAULT_CACHE_DIR)
+
+
+def _open_sinks(args):
+    from record_sinks import CsvSink, ParquetSink
+
+    sinks = []
+    if getattr(args, 'csv', None):
+        sinks.append(CsvSink(args.csv))
+    if getattr(args, 'parquet', None):
+        sinks.append(ParquetSink(args.parquet))
+    return sinks
+
+
+class _KeySink:
+    """Collects the (Pokedex Number, Variation) key of every record written"""
+
+    def __init__(self):
+        self.keys = set()
+
+    def write(self, record):
+        from checkpoint_store import row_key
+
+        self.keys.add(row_key(record['Pokedex Number'], record['Variation']))
+
+
+def cmd_fetch(args):
+    from pokemon_fetcher import fetch_pages
+
+    rows = load_rows(args.rows, args.start, args.end)
+    links = list(dict.fromkeys(rows['Link']))
+    pages = fetch_pages(links, workers=args.workers, requests_per_second=args.rate, timeout=args.timeout,
+                        cache=_page_cache(args), offline=args.offline)
+
+    missing = len(links) - len(pages)
+    print(f'{len(pages)} of {len(links)} pages {"cached" if args.offline else "fetched"}, {missing} missing')
+    return 1 if missing else 0
+
+
+def cmd_extract(args):
+    from checkpoint_store import row_key
+    from record_sinks import stream_records
+
+    rows = load_rows(args.rows, args.start, args.end)
+    if args.corpus:
+        from bulk_extract import bulk_extract_records, variants_by_dex
+
+        records = bulk_extract_records(args.corpus, variants_by_dex(rows), processes=args.processes)
+    else:
+        from pokemon_fetcher import fetch_pages
+        from pokemon_html_parser import iter_records_from_html
+
+        pages = fetch_pages(rows['Link'], cache=_page_cache(args), offline=True)
+        records = iter_records_from_html(rows, pages, 0, len(rows['Link']))
+
+    if args.master:
+        # The master file is rewritten once, so the records have to be held for it
+        records = list(records)
+    # Rows sharing a key yield one record from a corpus, so completeness is judged by key
+    expected = {row_key(dex_number, variation)
+                for dex_number, variation in zip(rows['Pokedex Number'], rows['Variation'])}
+    extracted = _KeySink()
+    count = stream_records(records, extracted, *_open_sinks(args))
+    missing = len(expected - extracted.keys)
+    print(f'{count} records extracted for {len(expected)} keys, {missing} missing')
+
+    if args.master:
+        from master_store import MasterStore
+
+        counts = MasterStore(args.master).upsert(records)
+        print(f'{args.master}: {counts["inserted"]} inserted, {counts["updated"]} updated, '
+              f'{counts["unchanged"]} unchanged')
+    return 1 if missing else 0
+
+
+def cmd_refresh(args):
+    from change_detection import HashStore, refresh_master
+
+    rows = load_rows(args.rows, args.start, args.end)
+    summary = refresh_master(rows, HashStore(args.hashes), master_path=args.master,
+                             cache=None if args.no_cache else _page_cache(args),
+                             check_revisions=args.check_revisions, workers=args.workers,
+                             requests_per_second=args.rate, timeout=args.timeout)
+    print(', '.join(f'{name}: {value}' for name, value in summary.items()))
+    return 1 if summary['fetched'] < summary['pages'] - summary['skipped_by_revision'] else 0
+
+
+def cmd_scrape(args):
+    from checkpoint_store import CheckpointStore
+    from driver_pool import headless_chrome
+    from final_fixed_get_more_pokemon_data import iter_pokemon_records
+    from record_sinks import stream_records
+    from scrape_metrics import RunMetrics
+
+    rows = load_rows(args.rows, args.start, args.end)
+    checkpoint = CheckpointStore(args.checkpoint) if args.checkpoint else None
+    metrics = RunMetrics()
+
+    driver = headless_chrome()
+    try:
+        records = iter_pokemon_records(rows, driver, 0, len(rows['Link']), checkpoint=checkpoint, metrics=metrics)
+        stream_records(records, *_open_sinks(args))
+    finally:
+        driver.quit()
+        print(metrics.format_summary())
+        if args.metrics:
+            metrics.write_json(args.metrics)
+    return 1 if metrics.counters.get('rows.failed') else 0
+
+
+def cmd_bench(args):
+    from benchmark_extraction import main as benchmark_main
+
+    bench_args = args.bench_args[1:] if args.bench_args[:1] == ['--'] else args.bench_args
+    return benchmark_main(bench_args)
+
+
+def acquire_lock(path):
+    '''
+    Takes an exclusive, non-blocking lock on path (created if needed)
+    Returns the open lock file, to be kept open for the whole run, or None if another
+    process holds it. Where fcntl is unavailable no lock is taken
+    '''
+    try:
+        import fcntl
+    except ImportError:
+        return open(os.devnull)
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    lock_file = open(path, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _add_rows_arguments(parser):
+    parser.add_argument('--rows', default=DEFAULT_ROWS, help='CSV of rows to process (Pokedex Number, Link, Variation)')
+    parser.add_argument('--start', type=int, default=0, help='first row of the batch')
+    parser.add_argument('--end', type=int, default=None, help='row after the last one of the batch')
+
+
+def _add_cache_arguments(parser):
+    parser.add_argument('--cache-dir', default=None, help='page cache directory (default data/page_cache)')
+
+
+def _add_network_arguments(parser):
+    parser.add_argument('--workers', type=int, default=8, help='concurrent downloads')
+    parser.add_argument('--rate', type=float, default=2.0, help='requests per second per host')
+    parser.add_argument('--timeout', type=float, default=30, help='seconds per request')
+
+
+def _add_output_arguments(parser):
+    parser.add_argument('--csv', help='CSV file records are appended to')
+    parser.add_argument('--parquet', help='Parquet file to write records to (requires pyarrow)')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pokes_cli', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--lock', default=DEFAULT_LOCK_PATH, help='lock file that keeps runs from overlapping')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    fetch = subcommands.add_parser('fetch', help='download species pages into the page cache')
+    _add_rows_arguments(fetch)
+    _add_cache_arguments(fetch)
+    _add_network_arguments(fetch)
+    fetch.add_argument('--offline', action='store_true', help='only report which pages are cached')
+    fetch.set_defaults(func=cmd_fetch)
+
+    extract = subcommands.add_parser('extract', help='extract records from cached or saved pages, offline')
+    _add_rows_arguments(extract)
+    _add_cache_arguments(extract)
+    _add_output_arguments(extract)
+    extract.add_argument('--corpus', help='directory, zip or tar of saved pages to read instead of the cache')
+    extract.add_argument('--processes', type=int, default=None, help='worker processes for --corpus')
+    extract.add_argument('--master', help='Parquet master file to upsert the records into')
+    extract.set_defaults(func=cmd_extract)
+
+    refresh = subcommands.add_parser('refresh', help='update the MASTER CSV from pages that changed')
+    _add_rows_arguments(refresh)
+    _add_cache_arguments(refresh)
+    _add_network_arguments(refresh)
+    refresh.add_argument('--master', default=DEFAULT_MASTER_CSV, help='MASTER CSV to update')
+    refresh.add_argument('--hashes', default=DEFAULT_HASH_PATH, help='page and record hashes from the last refresh')
+    refresh.add_argument('--check-revisions', action='store_true',
+                         help='skip pages whose wiki revision is unchanged without downloading them')
+    refresh.add_argument('--no-cache', action='store_true', help='always download, bypassing the page cache')
+    refresh.set_defaults(func=cmd_refresh)
+
+    scrape = subcommands.add_parser('scrape', help='scrape rows with headless Chrome (requires selenium)')
+    _add_rows_arguments(scrape)
+    _add_output_arguments(scrape)
+    scrape.add_argument('--checkpoint', help='checkpoint file; rows it already holds are skipped')
+    scrape.add_argument('--metrics', help='JSON file the run metrics are written to')
+    scrape.set_defaults(func=cmd_scrape)
+
+    bench = subcommands.add_parser('bench', help='run the extraction benchmark (arguments after -- are passed on)')
+    bench.add_argument('bench_args', nargs=argparse.REMAINDER)
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'extract' and not (args.csv or args.parquet or args.master):
+        parser.error('extract needs at least one of --csv, --parquet or --master')
+    if args.command == 'bench':
+        return args.func(args)
+
+    lock_file = acquire_lock(args.lock)
+    if lock_file is None:
+        print(f'Another run holds {args.lock}; exiting')
+        return EXIT_LOCKED
+    with lock_file:
+        return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
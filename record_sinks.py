@@ -0,0 +1,125 @@
+"""
+Incremental sinks for streamed Pokemon records.
+
+The record generators (iter_pokemon_records, iter_records_from_html) yield one complete
+record per row; stream_records fans each record out to any number of sinks as soon as
+it arrives, so results are written while the batch is still running and memory stays
+flat. A sink is any object with write(record) and, optionally, close().
+"""
+
+import csv
+import os
+
+from pokemon_html_parser import KEY_FIELDS, RECORD_FIELDS
+
+OUTPUT_FIELDS = KEY_FIELDS + RECORD_FIELDS
+
+
+def _blank_missing(value):
+    """NaN and None become None so they are written as empty cells."""
+    return None if value is None or value != value else value
+
+
+class CsvSink:
+    """Appends records to a CSV file, writing the header only when the file is new."""
+
+    def __init__(self, path, fields=OUTPUT_FIELDS):
+        self.path = path
+        self.fields = fields
+        self._file = None
+        self._writer = None
+
+    def write(self, record):
+        if self._file is None:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fields, extrasaction='ignore')
+            if new_file:
+                self._writer.writeheader()
+        self._writer.writerow({name: _blank_missing(record.get(name)) for name in self.fields})
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetSink:
+    """
+    Writes records to a Parquet file one row group at a time (requires pyarrow).
+    Values are kept as extracted; use typed_output for numeric columns.
+    """
+
+    def __init__(self, path, row_group_size=256):
+        import pyarrow as pa
+
+        self.path = path
+        self.row_group_size = row_group_size
+        self._schema = pa.schema(
+            [('Pokedex Number', pa.int16()), ('Variation', pa.string())]
+            + [(name, pa.string()) for name in RECORD_FIELDS]
+        )
+        self._rows = []
+        self._writer = None
+
+    def write(self, record):
+        row = {name: _blank_missing(record.get(name)) for name in OUTPUT_FIELDS}
+        if row['Pokedex Number'] is not None:
+            row['Pokedex Number'] = int(row['Pokedex Number'])
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self._schema))
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class FrameSink:
+    """Collects records column by column and builds a typed DataFrame at the end."""
+
+    def __init__(self):
+        self.columns = {name: [] for name in OUTPUT_FIELDS}
+
+    def write(self, record):
+        for name, values in self.columns.items():
+            values.append(record.get(name))
+
+    def frame(self):
+        from typed_output import to_typed_frame
+
+        return to_typed_frame(self.columns)
+
+
+def stream_records(records, *sinks):
+    """
+    Feed every record to every sink as it is produced; sinks are closed at the end,
+    even if the record source fails part-way
+    Returns the number of records written
+    """
+    count = 0
+    try:
+        for record in records:
+            for sink in sinks:
+                sink.write(record)
+            count += 1
+    finally:
+        for sink in sinks:
+            close = getattr(sink, 'close', None)
+            if close is not None:
+                close()
+    return count
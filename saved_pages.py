@@ -0,0 +1,69 @@
+"""
+The species pages saved in pokemonLinks_html/ and the values known to be on them.
+
+Shared by the tests and by benchmark_extraction, which checks EXPECTED_VARIANTS
+before it times anything.
+"""
+
+import os
+
+HTML_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pokemonLinks_html')
+
+# Expected values based on the HTML files
+EXPECTED_VARIANTS = [
+    {
+        "Pokemon": "Charizard",
+        "Variant": "No Variation",
+        "Expected_Height": "1.7 m",
+        "Expected_Weight": "90.5 kg",
+        "Notes": "Base form Charizard"
+    },
+    {
+        "Pokemon": "Charizard",
+        "Variant": "Mega Charizard X",
+        "Expected_Height": "1.7 m",
+        "Expected_Weight": "110.5 kg",
+        "Notes": "Mega X has same height but different weight"
+    },
+    {
+        "Pokemon": "Charizard",
+        "Variant": "Mega Charizard Y",
+        "Expected_Height": "1.7 m",
+        "Expected_Weight": "100.5 kg",
+        "Notes": "Mega Y has same height but different weight"
+    },
+    {
+        "Pokemon": "Venusaur",
+        "Variant": "Mega Venusaur",
+        "Expected_Height": "2.4 m",
+        "Expected_Weight": "155.5 kg",
+        "Notes": "Mega Venusaur has different height and weight from base"
+    },
+    {
+        "Pokemon": "Rattata",
+        "Variant": "No Variation",
+        "Expected_Height": "0.3 m",
+        "Expected_Weight": "3.5 kg",
+        "Notes": "Base form Rattata"
+    },
+    {
+        "Pokemon": "Rattata",
+        "Variant": "Alolan Rattata",
+        "Expected_Height": "0.3 m",
+        "Expected_Weight": "3.8 kg",
+        "Notes": "Alolan has same height but different weight"
+    },
+    {
+        "Pokemon": "Deoxys",
+        "Variant": "Defense Form",
+        "Expected_Height": "1.7 m",
+        "Expected_Weight": "60.8 kg",
+        "Notes": "All Deoxys forms share the same height/weight"
+    }
+]
+
+
+def load_saved_page(pokemon):
+    """Read one of the pages saved in pokemonLinks_html/"""
+    with open(os.path.join(HTML_DIR, f'{pokemon}_(Pokémon).html'), encoding='utf-8') as f:
+        return f.read()
@@ -0,0 +1,165 @@
+"""
+Structured metrics for scrape runs.
+
+RunMetrics collects counters and latency histograms per stage (page load, wait for
+the infobox, parse, types, sizes, ...) and turns them into a run summary with timeout
+and fallback rates, printable or exported as JSON. Functions that accept a metrics
+argument fall back to NULL_METRICS, which records nothing, so instrumentation costs
+nothing when it is not asked for.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Histogram bucket upper bounds in seconds; 30 s and 90 s are the wait and page-load timeouts
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 90, float('inf'))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with exact count, sum, min and max."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (capped at the observed max)"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_s': self.total / self.count if self.count else None,
+            'min_s': self.min,
+            'max_s': self.max,
+            'p50_s': self.percentile(50),
+            'p95_s': self.percentile(95),
+            'buckets': {('inf' if bound == float('inf') else str(bound)): count
+                        for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class RunMetrics:
+    """
+    Counters and per-stage histograms for one run. Safe to share between threads.
+    Counter names follow '<stage>.<event>', e.g. 'page_load.timeouts' or 'types.fallback'.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as one observation of a stage; an exception also counts '<name>.errors'"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.count(f'{name}.errors')
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def rate(self, numerator, denominator):
+        total = self.counters.get(denominator, 0)
+        return self.counters.get(numerator, 0) / total if total else None
+
+    def summary(self):
+        """Machine-readable run summary: counters, stage histograms and derived rates"""
+        with self._lock:
+            counters = dict(self.counters)
+            stages = {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+
+        timeouts = counters.get('page_load.timeouts', 0) + counters.get('wait_for_element.timeouts', 0)
+        pages = counters.get('pages.requested', 0)
+        return {
+            'started': self.started,
+            'elapsed_s': time.time() - self.started,
+            'counters': counters,
+            'stages': stages,
+            'rates': {
+                'timeout': timeouts / pages if pages else None,
+                'types_fallback': self.rate('types.fallback', 'records'),
+                'sizes_fallback': self.rate('sizes.fallback', 'records'),
+                'row_failure': self.rate('rows.failed', 'rows'),
+            },
+        }
+
+    def format_summary(self):
+        """Human-readable run summary, stages sorted by total time spent"""
+        summary = self.summary()
+        lines = [f"Run summary ({summary['elapsed_s']:.1f} s)"]
+        stages = sorted(summary['stages'].items(), key=lambda item: item[1]['total_s'], reverse=True)
+        for name, stats in stages:
+            lines.append(f"  {name:<18} n={stats['count']:<6} total={stats['total_s']:8.2f}s "
+                         f"mean={stats['mean_s']:.3f}s p95<={stats['p95_s']:.3f}s max={stats['max_s']:.3f}s")
+        for name, value in sorted(summary['counters'].items()):
+            lines.append(f'  {name:<28} {value}')
+        for name, value in summary['rates'].items():
+            if value is not None:
+                lines.append(f'  {name + " rate":<28} {value:.1%}')
+        return '\n'.join(lines)
+
+    def write_json(self, path):
+        """Write the run summary as JSON (atomically)"""
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+class _NullMetrics:
+    """Same interface as RunMetrics; records nothing."""
+
+    def count(self, name, n=1):
+        pass
+
+    def observe(self, stage, seconds):
+        pass
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+
+_NULL_STAGE = nullcontext()
+NULL_METRICS = _NullMetrics()
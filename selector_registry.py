@@ -0,0 +1,157 @@
+"""
+Declarative selector registry for locating infobox elements in a live browser.
+
+Each field (name, category, types, height, weight, ...) has a ranked list of
+relative XPaths anchored on the infobox and on stable labels (the 'Pokémon category'
+link, the Height/Weight/Type label links) instead of one absolute path from <html>.
+All of a field's candidates are tried inside the browser by one document.evaluate
+script, so a lookup is one WebDriver round-trip whether the first or the last
+selector hits, and a miss returns None instead of raising NoSuchElementException.
+The selector that hit is counted and moved to the front, so layout variants settle
+on their working selector after the first page.
+"""
+
+import threading
+from dataclasses import dataclass
+
+INFOBOX = "//table[contains(concat(' ', normalize-space(@class), ' '), ' infobox ')]"
+
+# The path load_pokemon_page used to wait on; kept as the last resort
+LEGACY_NAME_XPATH = ('/html/body/div[1]/div[2]/div[1]/div[3]/div[4]/div[1]/table[2]/tbody/tr[1]/td/table/'
+                     'tbody/tr[1]/td/table/tbody/tr/td[1]/big/big/b')
+
+
+def _label_table(*titles):
+    """The table right after a bold label linking to one of titles (how Height, Weight and Type are laid out)"""
+    condition = ' or '.join(f"@title='{title}'" for title in titles)
+    return f"{INFOBOX}//b[a[{condition}]]/following-sibling::table[1]"
+
+
+def _text_label_table(*labels):
+    condition = ' or '.join(f"normalize-space(.)='{label}'" for label in labels)
+    return f"//b[{condition}]/following-sibling::table[1]"
+
+
+FIELD_SELECTORS = {
+    'name': [
+        f"{INFOBOX}//td[a[@title='Pokémon category']]/big/big/b",
+        "//a[@title='Pokémon category']/preceding-sibling::big[1]/big/b",
+        f"{INFOBOX}//big/big/b",
+        LEGACY_NAME_XPATH,
+    ],
+    'category': [
+        f"{INFOBOX}//a[@title='Pokémon category']",
+        "//a[@title='Pokémon category']",
+    ],
+    'dex_number': [
+        f"{INFOBOX}//a[contains(@title, 'National Pokédex number')][starts-with(normalize-space(.), '#')]",
+        "//a[contains(@title, 'National Pokédex number')][starts-with(normalize-space(.), '#')]",
+    ],
+    'types': [
+        _label_table('Type'),
+        _text_label_table('Type', 'Types'),
+    ],
+    'height': [
+        _label_table('List of Pokémon by height', 'Height'),
+        _text_label_table('Height'),
+    ],
+    'weight': [
+        _label_table('Weight', 'List of Pokémon by weight'),
+        _text_label_table('Weight'),
+    ],
+}
+
+# Tries every field's candidates in order and returns, per field, [index, element] or null
+_FIND_SCRIPT = '''
+const fields = arguments[0];
+return fields.map(function (xpaths) {
+    for (let i = 0; i < xpaths.length; i++) {
+        let node = null;
+        try {
+            node = document.evaluate(xpaths[i], document, null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } catch (e) {
+            node = null;
+        }
+        if (node) {
+            return [i, node];
+        }
+    }
+    return null;
+});
+'''
+
+
+@dataclass
+class Selector:
+    """One candidate XPath for a field and how often it matched."""
+    xpath: str
+    hits: int = 0
+
+
+class FieldSelectors:
+    """Ranked candidates for one field; the last selector that hit comes first."""
+
+    def __init__(self, field, xpaths):
+        self.field = field
+        self.selectors = [Selector(xpath) for xpath in xpaths]
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def ranked(self):
+        with self._lock:
+            return list(self.selectors)
+
+    def record(self, selector):
+        """Count a hit (or a miss, for None) and move the selector that hit to the front"""
+        with self._lock:
+            if selector is None:
+                self.misses += 1
+                return
+            selector.hits += 1
+            if self.selectors[0] is not selector:
+                self.selectors.remove(selector)
+                self.selectors.insert(0, selector)
+
+
+class SelectorRegistry:
+    """Selectors for every field, shared by all drivers of a session."""
+
+    def __init__(self, fields=None):
+        fields = FIELD_SELECTORS if fields is None else fields
+        self.fields = {field: FieldSelectors(field, xpaths) for field, xpaths in fields.items()}
+
+    def find_many(self, driver, fields):
+        '''
+        Locate several fields in one round-trip
+        Returns a dict of field -> element, or None for fields no selector matched
+        '''
+        ranked = [self.fields[field].ranked() for field in fields]
+        results = driver.execute_script(_FIND_SCRIPT, [[s.xpath for s in selectors] for selectors in ranked])
+
+        found = {}
+        for field, selectors, result in zip(fields, ranked, results or [None] * len(fields)):
+            selector = selectors[result[0]] if result else None
+            self.fields[field].record(selector)
+            found[field] = result[1] if result else None
+        return found
+
+    def find(self, driver, field):
+        """The element for one field, or None; one round-trip either way"""
+        return self.find_many(driver, [field])[field]
+
+    def present(self, field):
+        """Condition for WebDriverWait(...).until: the field's element once any selector matches"""
+        def condition(driver):
+            return self.find(driver, field) or False
+        return condition
+
+    def stats(self):
+        """Per field: the current ranking with hit counts, and the number of misses"""
+        return {
+            field: {'selectors': [(s.xpath, s.hits) for s in selectors.ranked()], 'misses': selectors.misses}
+            for field, selectors in self.fields.items()
+        }
+
+
+DEFAULT_SELECTORS = SelectorRegistry()
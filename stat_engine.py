@@ -0,0 +1,223 @@
+"""
+Vectorized derived stats and comparisons over the master dataset.
+
+StatEngine copies the numeric columns of a master frame into one contiguous float64
+matrix and the grouping columns (types, generation) into integer codes once; every
+metric is then a handful of array operations over all rows instead of a row-wise
+apply: BMI-style ratios, percentiles and z-scores within a type or generation,
+variant-vs-base deltas, and cosine similarity / nearest neighbours on the stats.
+take() narrows the engine to the rows a dashboard filter selected (e.g. positions
+from MasterQuery) without rebuilding anything.
+"""
+
+import numpy as np
+import pandas as pd
+
+from master_store import MASTER_CSV, STAT_FIELDS, master_from_csv
+from pokemon_html_parser import NO_VARIATION
+
+SIZE_FIELDS = ('Height (m)', 'Weight (kg)')
+ENGINE_COLUMNS = STAT_FIELDS + SIZE_FIELDS
+GROUP_COLUMNS = ('Type 1', 'Type 2', 'Generation')
+
+# The six base stats; Stat Total is their sum and would double-count in distances
+SIMILARITY_COLUMNS = ('HP', 'Attack', 'Defense', 'Speed', 'Special Attack', 'Special Defense')
+
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, NaN where the denominator is 0 or missing"""
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=np.nan_to_num(denominator) != 0)
+    return out
+
+
+class StatEngine:
+    """Derived metrics over a master frame (see master_store.master_from_csv)."""
+
+    def __init__(self, frame, columns=ENGINE_COLUMNS, group_columns=GROUP_COLUMNS):
+        self.index = frame.index
+        self.columns = tuple(column for column in columns if column in frame)
+        self.values = np.ascontiguousarray(
+            np.column_stack([frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                             for column in self.columns])
+        )
+        self._column = {column: i for i, column in enumerate(self.columns)}
+
+        # -1 marks a missing group value (e.g. no Type 2)
+        self.groups = {}
+        for column in group_columns:
+            if column in frame:
+                codes, labels = pd.factorize(frame[column])
+                self.groups[column] = (codes, labels)
+
+        self.dex_numbers = frame['Pokedex Number'].to_numpy(dtype=np.int64)
+        self.base_mask = (frame['Variation'] == NO_VARIATION).to_numpy(dtype=bool)
+
+    @classmethod
+    def from_master(cls, path=MASTER_CSV):
+        return cls(master_from_csv(path))
+
+    def __len__(self):
+        return len(self.values)
+
+    def column(self, name):
+        return self.values[:, self._column[name]]
+
+    def take(self, positions):
+        """A new engine over some rows (positions or a boolean mask); nothing is recomputed"""
+        subset = object.__new__(StatEngine)
+        subset.index = self.index[positions]
+        subset.columns = self.columns
+        subset.values = np.ascontiguousarray(self.values[positions])
+        subset._column = self._column
+        subset.groups = {name: (codes[positions], labels) for name, (codes, labels) in self.groups.items()}
+        subset.dex_numbers = self.dex_numbers[positions]
+        subset.base_mask = self.base_mask[positions]
+        return subset
+
+    def _frame(self, data, columns):
+        return pd.DataFrame(data, index=self.index, columns=list(columns))
+
+    def derived(self):
+        '''
+        BMI-style ratios for every row:
+        BMI (kg/m^2), Attack/Defense, Sp. Atk/Sp. Def, Offense/Defense
+        ((Attack + Special Attack) / (Defense + Special Defense)) and Bulk
+        (HP * (Defense + Special Defense) / 100)
+        '''
+        height, weight = self.column('Height (m)'), self.column('Weight (kg)')
+        attack, defense = self.column('Attack'), self.column('Defense')
+        special_attack, special_defense = self.column('Special Attack'), self.column('Special Defense')
+
+        return pd.DataFrame({
+            'BMI': _ratio(weight, height * height),
+            'Attack/Defense': _ratio(attack, defense),
+            'Sp. Atk/Sp. Def': _ratio(special_attack, special_defense),
+            'Offense/Defense': _ratio(attack + special_attack, defense + special_defense),
+            'Bulk': self.column('HP') * (defense + special_defense) / 100,
+        }, index=self.index)
+
+    def _group_codes(self, by):
+        codes, _ = self.groups[by]
+        return codes
+
+    def percentiles(self, by='Type 1', columns=None):
+        '''
+        Percentile rank (0-100] of each value within its group, for every column;
+        the same as pandas groupby(by).rank(pct=True, method='min') * 100.
+        Rows with a missing value or group are NaN
+        '''
+        columns = self.columns if columns is None else tuple(columns)
+        codes = self._group_codes(by)
+        out = np.full((len(self), len(columns)), np.nan)
+
+        for j, name in enumerate(columns):
+            values = self.column(name)
+            valid = np.flatnonzero((codes >= 0) & ~np.isnan(values))
+            if not len(valid):
+                continue
+            group, value = codes[valid], values[valid]
+            order = np.lexsort((value, group))
+            group, value = group[order], value[order]
+
+            n = len(order)
+            positions = np.arange(n)
+            # First position of each group, and of each run of equal values in it
+            group_start = np.maximum.accumulate(np.where(np.r_[True, group[1:] != group[:-1]], positions, 0))
+            new_run = np.r_[True, (group[1:] != group[:-1]) | (value[1:] != value[:-1])]
+            run_start = np.maximum.accumulate(np.where(new_run, positions, 0))
+
+            counts = np.bincount(group)
+            ranks = (run_start - group_start + 1) / counts[group]
+            out[valid[order], j] = ranks * 100
+
+        return self._frame(out, columns)
+
+    def zscores(self, by='Type 1', columns=None):
+        '''
+        (value - group mean) / group standard deviation (ddof=0) for every column;
+        NaN for missing values or groups and for groups with no spread
+        '''
+        columns = self.columns if columns is None else tuple(columns)
+        codes = self._group_codes(by)
+        n_groups = int(codes.max()) + 1 if len(codes) else 0
+        values = np.column_stack([self.column(name) for name in columns])
+
+        valid = (codes >= 0)[:, None] & ~np.isnan(values)
+        safe_codes = np.where(codes >= 0, codes, 0)
+        out = np.full(values.shape, np.nan)
+        for j in range(values.shape[1]):
+            weights = valid[:, j]
+            x = np.where(weights, values[:, j], 0.0)
+            count = np.bincount(safe_codes, weights=weights, minlength=n_groups)
+            total = np.bincount(safe_codes, weights=x, minlength=n_groups)
+            mean = _ratio(total, count)
+            squares = np.bincount(safe_codes, weights=np.where(weights, (x - mean[safe_codes]) ** 2, 0.0),
+                                  minlength=n_groups)
+            std = np.sqrt(_ratio(squares, count))
+            z = _ratio(values[:, j] - mean[safe_codes], std[safe_codes])
+            out[:, j] = np.where(weights, z, np.nan)
+
+        return self._frame(out, columns)
+
+    def base_positions(self):
+        """Row position of each row's base form (same Pokedex Number, No Variation), or -1"""
+        base_rows = np.flatnonzero(self.base_mask)
+        if not len(base_rows):
+            return np.full(len(self), -1)
+        # np.unique keeps the first base row when a number has several
+        base_dex, first = np.unique(self.dex_numbers[base_rows], return_index=True)
+        base_rows = base_rows[first]
+        found = np.minimum(np.searchsorted(base_dex, self.dex_numbers), len(base_dex) - 1)
+        return np.where(base_dex[found] == self.dex_numbers, base_rows[found], -1)
+
+    def variant_deltas(self, columns=None):
+        '''
+        Each row's values minus its base form's, per column (0 for base forms);
+        NaN for rows whose base form is not in the engine
+        '''
+        columns = self.columns if columns is None else tuple(columns)
+        selected = [self._column[name] for name in columns]
+        base = self.base_positions()
+        values = self.values[:, selected]
+        deltas = values - values[np.maximum(base, 0)]
+        deltas[base < 0] = np.nan
+        return self._frame(deltas, columns)
+
+    def _standardized(self, columns):
+        """Columns scaled to mean 0 / std 1 across rows; missing values become the mean (0)"""
+        values = np.column_stack([self.column(name) for name in columns])
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        scaled = _ratio(values - mean, std)
+        return np.nan_to_num(scaled, nan=0.0)
+
+    def similarity(self, columns=SIMILARITY_COLUMNS):
+        """Pairwise cosine similarity of standardized stats, as a len x len array"""
+        scaled = self._standardized(columns)
+        norms = np.linalg.norm(scaled, axis=1, keepdims=True)
+        unit = np.nan_to_num(_ratio(scaled, norms), nan=0.0)
+        return unit @ unit.T
+
+    def nearest(self, k=5, columns=SIMILARITY_COLUMNS, positions=None):
+        '''
+        The k nearest rows to each row (or to each of positions) by Euclidean distance
+        over standardized stats, excluding the row itself
+        Returns (neighbour positions, distances), both shaped (rows, k), closest first
+        '''
+        scaled = self._standardized(columns)
+        queries = scaled if positions is None else scaled[positions]
+        query_rows = np.arange(len(scaled)) if positions is None else np.asarray(positions)
+
+        squared = (np.einsum('ij,ij->i', queries, queries)[:, None]
+                   + np.einsum('ij,ij->i', scaled, scaled)[None, :]
+                   - 2 * queries @ scaled.T)
+        np.maximum(squared, 0, out=squared)
+        squared[np.arange(len(queries)), query_rows] = np.inf
+
+        k = min(k, len(scaled) - 1)
+        candidates = np.argpartition(squared, k - 1, axis=1)[:, :k] if k > 0 else np.empty((len(queries), 0), int)
+        candidate_distances = np.take_along_axis(squared, candidates, axis=1)
+        order = np.argsort(candidate_distances, axis=1, kind='stable')
+        neighbours = np.take_along_axis(candidates, order, axis=1)
+        return neighbours, np.sqrt(np.take_along_axis(candidate_distances, order, axis=1))
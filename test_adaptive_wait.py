@@ -0,0 +1,145 @@
+"""
+Tests for adaptive page-load and element waits
+"""
+
+import pytest
+
+from adaptive_wait import BLOCKED_URL_PATTERNS, AdaptiveWaits, LatencyTracker, block_unused_resources
+from scrape_metrics import RunMetrics
+
+
+class FakeDriver:
+    """Records timeouts; get() hangs (raises TimeoutException) the first hangs times"""
+
+    def __init__(self, hangs=0, page_source=''):
+        self.timeouts = []
+        self.cdp = []
+        self.hangs = hangs
+        self.loaded = []
+        self.page_source = page_source
+
+    def get(self, link):
+        from selenium.common.exceptions import TimeoutException
+
+        self.loaded.append(link)
+        if len(self.loaded) <= self.hangs:
+            raise TimeoutException('page load hung')
+
+    def execute_script(self, script, fields):
+        # The selector registry's lookup: the first selector of every field matches
+        return [[0, f'<element {field[0]}>'] for field in fields]
+
+    def set_page_load_timeout(self, seconds):
+        self.timeouts.append(seconds)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+
+
+def test_timeout_is_the_ceiling_until_enough_samples():
+    tracker = LatencyTracker(ceiling=90, floor=5, min_samples=10)
+    for _ in range(9):
+        tracker.observe(1.0)
+
+    assert tracker.timeout() == 90
+
+
+def test_timeout_follows_the_observed_percentile_within_bounds():
+    tracker = LatencyTracker(ceiling=30, floor=2, percentile=95, headroom=2.0, min_samples=10)
+    for seconds in [0.5] * 18 + [3.0, 4.0]:
+        tracker.observe(seconds)
+
+    assert tracker.timeout() == pytest.approx(8.0)
+    # Each retry doubles the timeout, never past the ceiling
+    assert tracker.timeout(attempt=1) == pytest.approx(16.0)
+    assert tracker.timeout(attempt=3) == 30
+
+    fast = LatencyTracker(ceiling=30, floor=2, min_samples=1)
+    fast.observe(0.1)
+    assert fast.timeout() == 2
+
+
+def test_window_forgets_old_latencies():
+    tracker = LatencyTracker(ceiling=90, floor=1, window=10, min_samples=10)
+    for _ in range(10):
+        tracker.observe(40.0)
+    for _ in range(10):
+        tracker.observe(1.0)
+
+    assert tracker.timeout() == 2.0
+
+
+def test_page_load_timeout_is_only_sent_when_it_changes():
+    waits = AdaptiveWaits(page_load=LatencyTracker(ceiling=90, floor=5, min_samples=1))
+    driver = FakeDriver()
+
+    waits.set_page_load_timeout(driver)
+    waits.set_page_load_timeout(driver)
+    waits.set_page_load_timeout(driver, attempt=1)
+    waits.page_load.observe(3.0)
+    waits.set_page_load_timeout(driver)
+
+    assert driver.timeouts == [90, 6.0]
+
+
+def test_attempts_back_off_exponentially(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr('adaptive_wait.time.sleep', sleeps.append)
+    monkeypatch.setattr('adaptive_wait.random.uniform', lambda low, high: 1.0)
+
+    assert list(AdaptiveWaits(retries=3, backoff=0.5).attempts()) == [0, 1, 2, 3]
+    assert sleeps == [0.5, 1.0, 2.0]
+
+
+def test_block_unused_resources_uses_cdp_when_available():
+    driver = FakeDriver()
+
+    assert block_unused_resources(driver)
+    assert driver.cdp[1] == ('Network.setBlockedURLs', {'urls': list(BLOCKED_URL_PATTERNS)})
+    assert not block_unused_resources(object())
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr('adaptive_wait.time.sleep', sleeps.append)
+    monkeypatch.setattr('adaptive_wait.random.uniform', lambda low, high: 1.0)
+    return sleeps
+
+
+def learnt_waits():
+    waits = AdaptiveWaits(page_load=LatencyTracker(ceiling=90, floor=5, min_samples=1), retries=2, backoff=1.0)
+    waits.page_load.observe(10.0)
+    return waits
+
+
+def test_timed_out_page_is_retried_with_backoff_and_a_longer_timeout(sleeps, saved_page):
+    pytest.importorskip('selenium')
+    from final_fixed_get_more_pokemon_data import load_pokemon_page
+
+    driver = FakeDriver(hangs=1, page_source=saved_page('Charizard'))
+    metrics = RunMetrics()
+
+    page = load_pokemon_page(driver, 'charizard', metrics, learnt_waits())
+
+    assert page.name == 'Charizard'
+    assert driver.loaded == ['charizard', 'charizard']
+    assert driver.timeouts == [20.0, 40.0]
+    assert sleeps == [1.0]
+    assert metrics.counters['pages.retries'] == 1 and metrics.counters['page_load.timeouts'] == 1
+
+
+def test_page_that_hangs_on_every_attempt_raises(sleeps):
+    pytest.importorskip('selenium')
+    from selenium.common.exceptions import TimeoutException
+
+    from final_fixed_get_more_pokemon_data import load_pokemon_page
+
+    driver = FakeDriver(hangs=3)
+
+    with pytest.raises(TimeoutException):
+        load_pokemon_page(driver, 'charizard', waits=learnt_waits())
+
+    assert len(driver.loaded) == 3
+    assert driver.timeouts == [20.0, 40.0, 80.0]
+    assert sleeps == [1.0, 2.0]
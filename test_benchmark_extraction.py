@@ -0,0 +1,51 @@
+"""
+Tests for the extraction benchmark harness
+"""
+
+import json
+
+import pytest
+
+from benchmark_extraction import baseline_for, check_expected_values, compare, load_pages, main, run_benchmark
+
+
+def test_run_benchmark_reports_pages_fields_and_memory():
+    result = run_benchmark(repeat=2)
+
+    assert set(result['pages']) == {'Charizard', 'Deoxys', 'Rattata', 'Venusaur'}
+    assert result['pages']['Charizard']['variants'] == 3
+    assert result['pages']['Charizard']['parse']['n'] == 2
+    assert result['pages']['Rattata']['peak_memory_bytes'] > 0
+    assert result['fields']['sizes']['n'] == 2 * 9
+    assert result['pages_per_second'] > 0
+
+
+def test_wrong_extraction_is_never_benchmarked():
+    pages = load_pages()
+    pages['Charizard'] = pages['Venusaur']
+
+    with pytest.raises(AssertionError, match='Charizard / Mega Charizard X'):
+        check_expected_values(pages)
+
+
+def test_compare_flags_slower_medians_only():
+    def entry(commit, parse_us, record_us):
+        return {'commit': commit, 'pages': {'Rattata': {'parse': {'median_us': parse_us}}},
+                'fields': {'record': {'median_us': record_us}}}
+
+    before, after = entry('a', 1000, 5.0), entry('b', 1300, 4.0)
+
+    assert [name for name, *_ in compare(after, before)] == ['parse Rattata']
+    assert baseline_for(after, [before, entry('b', 1, 1)]) is before
+
+
+def test_main_appends_results_keyed_by_commit(tmp_path, capsys):
+    results = tmp_path / 'benchmarks.jsonl'
+
+    assert main(['--repeat', '1', '--results', str(results)]) == 0
+    assert main(['--repeat', '1', '--results', str(results)]) == 0
+
+    lines = [json.loads(line) for line in results.read_text(encoding='utf-8').splitlines()]
+    assert len(lines) == 2
+    assert {'commit', 'dirty', 'timestamp', 'pages', 'fields'} <= set(lines[0])
+    assert 'pages/s' in capsys.readouterr().out
@@ -0,0 +1,90 @@
+"""
+Tests for multi-process bulk extraction over saved pages
+"""
+
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from bulk_extract import bulk_extract_records, variants_by_dex
+from saved_pages import HTML_DIR
+
+VARIANTS = {
+    3: ['No Variation', 'Mega Venusaur'],
+    6: ['Mega Charizard X'],
+    19: ['Alolan Rattata'],
+    386: ['Defense Forme'],
+    # Not in the corpus: only holds back numbers above it until the end
+    25: ['No Variation'],
+}
+
+
+def keys(records):
+    return [(r['Pokedex Number'], r['Variation'], r['Weight (kg)']) for r in records]
+
+
+EXPECTED = [
+    (3, 'No Variation', '100.0 kg'),
+    (3, 'Mega Venusaur', '155.5 kg'),
+    (6, 'Mega Charizard X', '110.5 kg'),
+    (19, 'Alolan Rattata', '3.8 kg'),
+    (386, 'Defense Forme', '60.8 kg'),
+]
+
+
+def test_variants_by_dex_keeps_distinct_forms_in_row_order():
+    rows = {'Pokedex Number': ['0006', '0006', '0006', '0019'],
+            'Variation': ['No Variation', 'Mega Charizard X', 'Mega Charizard X', None]}
+
+    assert variants_by_dex(rows) == {6: ['No Variation', 'Mega Charizard X'], 19: ['No Variation']}
+
+
+def test_directory_records_stream_in_pokedex_order():
+    assert keys(bulk_extract_records(HTML_DIR, VARIANTS, processes=2, chunksize=1)) == EXPECTED
+
+
+@pytest.mark.parametrize('kind', ['zip', 'tar.gz'])
+def test_archives_give_the_same_records(tmp_path, kind):
+    archive = str(tmp_path / f'pages.{kind}')
+    names = sorted(os.listdir(HTML_DIR))
+    if kind == 'zip':
+        with zipfile.ZipFile(archive, 'w') as z:
+            for name in names:
+                z.write(os.path.join(HTML_DIR, name), name)
+    else:
+        with tarfile.open(archive, 'w:gz') as t:
+            for name in names:
+                t.add(os.path.join(HTML_DIR, name), name)
+
+    assert keys(bulk_extract_records(archive, VARIANTS, processes=2)) == EXPECTED
+
+
+def test_without_a_variant_list_every_page_yields_its_base_form(tmp_path, capsys):
+    corpus = tmp_path / 'pages'
+    corpus.mkdir()
+    for name in os.listdir(HTML_DIR):
+        (corpus / name).write_bytes(open(os.path.join(HTML_DIR, name), 'rb').read())
+    (corpus / 'Broken.html').write_text('<html><body>no infobox</body></html>', encoding='utf-8')
+
+    records = list(bulk_extract_records(str(corpus), processes=2))
+
+    assert [r['Pokemon'] for r in records] == ['Venusaur', 'Charizard', 'Rattata', 'Deoxys']
+    assert 'Could not parse' in capsys.readouterr().out
+
+
+def test_unreadable_pages_are_reported_and_skipped(tmp_path, capsys):
+    corpus = tmp_path / 'pages'
+    corpus.mkdir()
+    rattata = 'Rattata_(Pokémon).html'
+    (corpus / rattata).write_bytes(open(os.path.join(HTML_DIR, rattata), 'rb').read())
+    (corpus / 'Latin1.html').write_bytes('<html><body>Pok\xe9mon</body></html>'.encode('latin-1'))
+    (corpus / 'Folder.html').mkdir()
+
+    records = list(bulk_extract_records(str(corpus), {19: ['Alolan Rattata']}, processes=1))
+
+    assert keys(records) == [(19, 'Alolan Rattata', '3.8 kg')]
+    output = capsys.readouterr().out
+    assert 'Could not parse' in output and 'Latin1.html' in output
+    assert 'Could not read' in output and 'Folder.html' in output
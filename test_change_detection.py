@@ -0,0 +1,148 @@
+"""
+Tests for change detection and incremental master refreshes
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import change_detection
+from change_detection import HashStore, merge_into_master_csv, page_title, record_hash, refresh_master
+
+MASTER_HEADER = 'Pokedex Number,Pokemon,HP,Variation,Category,Type 1,Type 2,Height (m),Weight (kg)\n'
+MASTER_ROWS = (
+    '6,Charizard,78,,Flame Pokémon,Fire,Flying,1.7,90.5\n'
+    '6,Charizard,78,Mega Charizard X,Flame Pokémon,Fire,Flying,1.7,90.5\n'
+    '19,Rattata,30,,Mouse Pokémon,Normal,,0.3,3.5\n'
+)
+
+
+@pytest.fixture
+def master_csv(tmp_path):
+    path = tmp_path / 'pokemon_dataset_MASTER.csv'
+    path.write_text(MASTER_HEADER + MASTER_ROWS, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def rows(local_page_server):
+    charizard, rattata = local_page_server('Charizard'), local_page_server('Rattata')
+    return pd.DataFrame({'Pokedex Number': [6, 6, 19], 'Link': [charizard, charizard, rattata],
+                         'Variation': ['No Variation', 'Mega Charizard X', 'No Variation']})
+
+
+def test_record_hash_ignores_key_fields_and_missing_value_spelling():
+    record = {'Pokemon': 'Rattata', 'Category': 'Mouse Pokémon', 'Type 1': 'Normal', 'Type 2': None,
+              'Height (m)': '0.3 m', 'Weight (kg)': '3.5 kg'}
+
+    assert record_hash(record) == record_hash({**record, 'Type 2': float('nan'), 'Variation': 'x'})
+    assert record_hash(record) != record_hash({**record, 'Weight (kg)': '3.8 kg'})
+    assert page_title('https://bulbapedia.bulbagarden.net/wiki/Charizard_(Pok%C3%A9mon)') == 'Charizard (Pokémon)'
+
+
+def test_merge_rewrites_only_matching_rows(master_csv):
+    record = {'Pokedex Number': 6, 'Variation': 'Mega Charizard X', 'Pokemon': 'Charizard',
+              'Category': 'Flame Pokémon', 'Type 1': 'Fire', 'Type 2': 'Dragon',
+              'Height (m)': '1.7 m', 'Weight (kg)': '110.5 kg'}
+
+    assert merge_into_master_csv([record], master_csv) == 1
+
+    lines = open(master_csv, encoding='utf-8').read().splitlines(keepends=True)
+    assert lines[2] == '6,Charizard,78,Mega Charizard X,Flame Pokémon,Fire,Dragon,1.7,110.5\n'
+    untouched = MASTER_ROWS.splitlines(keepends=True)
+    assert [lines[1], lines[3]] == [untouched[0], untouched[2]]
+
+
+def test_merge_appends_records_without_a_row(master_csv):
+    record = {'Pokedex Number': 6, 'Variation': 'Mega Charizard Y', 'Pokemon': 'Charizard',
+              'Category': 'Flame Pokémon', 'Type 1': 'Fire', 'Type 2': 'Flying',
+              'Height (m)': '1.7 m', 'Weight (kg)': '100.5 kg'}
+
+    assert merge_into_master_csv([record], master_csv) == 1
+
+    lines = open(master_csv, encoding='utf-8').read().splitlines(keepends=True)
+    assert lines[1:4] == MASTER_ROWS.splitlines(keepends=True)
+    assert lines[4] == '6,Charizard,,Mega Charizard Y,Flame Pokémon,Fire,Flying,1.7,100.5\n'
+
+
+def test_refresh_merges_variants_missing_from_the_master(tmp_path, rows):
+    master_csv = tmp_path / 'master.csv'
+    master_csv.write_text(MASTER_HEADER + MASTER_ROWS.splitlines(keepends=True)[0], encoding='utf-8')
+    hashes = HashStore(str(tmp_path / 'hashes.json'))
+    charizard = rows[rows['Pokedex Number'] == 6]
+
+    first = refresh_master(charizard, hashes, master_path=str(master_csv), requests_per_second=100)
+    second = refresh_master(charizard, HashStore(hashes.path), master_path=str(master_csv), requests_per_second=100)
+
+    assert first['changed_records'] == 2 and first['merged_rows'] == 2
+    assert second['changed_records'] == 0
+    master = pd.read_csv(master_csv)
+    assert master['Variation'].tolist()[1] == 'Mega Charizard X'
+    assert master['Weight (kg)'].tolist() == [90.5, 110.5]
+
+
+def test_pages_that_fail_to_parse_are_retried(tmp_path, master_csv, rows, monkeypatch):
+    import pokemon_html_parser
+
+    def unparsable(html):
+        raise ValueError('no infobox')
+
+    hashes = HashStore(str(tmp_path / 'hashes.json'))
+    with monkeypatch.context() as patch:
+        patch.setattr(pokemon_html_parser, 'parse_pokemon_page', unparsable)
+        failed = refresh_master(rows, hashes, master_path=master_csv, requests_per_second=100)
+
+    assert failed['changed_records'] == 0 and HashStore(hashes.path).pages == {}
+    retried = refresh_master(rows, HashStore(hashes.path), master_path=master_csv, requests_per_second=100)
+    assert retried['changed_pages'] == 2 and retried['merged_rows'] == 3
+
+
+def test_page_hash_ignores_per_response_noise(tmp_path, master_csv, rows, monkeypatch):
+    hashes = HashStore(str(tmp_path / 'hashes.json'))
+    refresh_master(rows, hashes, master_path=master_csv, requests_per_second=100)
+    saved = change_detection.fetch_pages(list(rows['Link']))
+
+    def serve(edit):
+        pages = {link: edit(html) for link, html in saved.items()}
+        monkeypatch.setattr(change_detection, 'fetch_pages', lambda links, **kwargs: pages)
+        return refresh_master(rows, HashStore(hashes.path), master_path=master_csv, requests_per_second=100)
+
+    noisy = serve(lambda html: html.replace('wgRequestId":"', 'wgRequestId":"0').replace('Cached time: ', 'Cached time: 1'))
+    assert noisy['fetched'] == 2 and noisy['changed_pages'] == 0
+
+    edited = serve(lambda html: html.replace('90.5 kg', '91.0 kg'))
+    assert edited['changed_pages'] == 1 and edited['changed_records'] == 1
+
+
+def test_quiet_refresh_touches_nothing(tmp_path, master_csv, rows):
+    hashes = HashStore(str(tmp_path / 'hashes.json'))
+
+    first = refresh_master(rows, hashes, master_path=master_csv, requests_per_second=100)
+
+    # Only Mega Charizard X differs from the saved pages
+    assert first['changed_pages'] == 2 and first['merged_rows'] == 3
+    master = pd.read_csv(master_csv)
+    assert master['Weight (kg)'].tolist() == [90.5, 110.5, 3.5]
+    assert master['Type 2'].tolist()[1] == 'Dragon'
+
+    mtime = os.stat(master_csv).st_mtime_ns
+    second = refresh_master(rows, HashStore(hashes.path), master_path=master_csv, requests_per_second=100)
+
+    assert second['changed_pages'] == 0 and second['changed_records'] == 0
+    assert os.stat(master_csv).st_mtime_ns == mtime
+
+
+def test_unchanged_revisions_skip_the_download(tmp_path, master_csv, rows, local_page_server, monkeypatch):
+    revisions = {link: 100 for link in rows['Link']}
+    monkeypatch.setattr(change_detection, 'fetch_revision_ids', lambda links, timeout: dict(revisions))
+    hashes = HashStore(str(tmp_path / 'hashes.json'))
+
+    refresh_master(rows, hashes, master_path=master_csv, check_revisions=True, requests_per_second=100)
+    served = len(local_page_server.responses)
+    revisions[rows['Link'][2]] = 101
+    summary = refresh_master(rows, hashes, master_path=master_csv, check_revisions=True, requests_per_second=100)
+
+    assert summary['skipped_by_revision'] == 1
+    assert len(local_page_server.responses) == served + 1
+    assert summary['changed_pages'] == 0
@@ -0,0 +1,65 @@
+"""
+Tests for the append-only checkpoint store and resumable runs
+"""
+
+from checkpoint_store import CheckpointStore, get_more_pokemon_data_checkpointed, row_key
+
+
+def test_row_key_normalizes_base_forms():
+    assert row_key('0006', 'No Variation') == (6, 'No Variation')
+    assert row_key(6, float('nan')) == (6, 'No Variation')
+    assert row_key(6, 'Mega Charizard X') == (6, 'Mega Charizard X')
+
+
+def test_store_survives_reopen_and_latest_attempt_wins(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    store = CheckpointStore(path)
+    store.record_failure(19, 'Alolan Rattata', 'timed out')
+    store.record_success(19, 'No Variation', {'Pokemon': 'Rattata'})
+
+    reopened = CheckpointStore(path)
+    assert reopened.completed == {(19, 'No Variation')}
+    assert reopened.failed == {(19, 'Alolan Rattata'): 'timed out'}
+
+    reopened.record_success(19, 'Alolan Rattata', {'Pokemon': 'Rattata'})
+    assert CheckpointStore(path).failed == {}
+
+
+def test_store_ignores_a_truncated_last_line(tmp_path):
+    path = tmp_path / 'run.jsonl'
+    CheckpointStore(str(path)).record_success(3, 'Mega Venusaur', {'Pokemon': 'Venusaur'})
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"key": [6, "No Vari')
+
+    assert CheckpointStore(str(path)).completed == {(3, 'Mega Venusaur')}
+
+
+def test_resumed_run_only_retries_unfinished_rows(tmp_path, local_page_server):
+    rows = {
+        'Pokedex Number': [6, 6, 19, 19],
+        'Link': [local_page_server('Charizard'), local_page_server('Charizard'),
+                 local_page_server('Rattata'), local_page_server('Rattata')],
+        'Variation': ['No Variation', 'Mega Charizard X', 'No Variation', 'Alolan Rattata'],
+    }
+    store = CheckpointStore(str(tmp_path / 'run.jsonl'))
+    store.record_success(6, 'No Variation', {'Pokemon': 'Charizard', 'Category': 'Flame Pokémon',
+                                             'Type 1': 'Fire', 'Type 2': 'Flying',
+                                             'Height (m)': '1.7 m', 'Weight (kg)': '90.5 kg'})
+    store.record_failure(19, 'Alolan Rattata', 'driver crashed')
+
+    data = get_more_pokemon_data_checkpointed(rows, store, batch_size=2, requests_per_second=100)
+
+    assert data['Weight (kg)'] == ['90.5 kg', '110.5 kg', '3.5 kg', '3.8 kg']
+    assert store.failed == {}
+    # Charizard's page is still needed for Mega X; nothing is requested for the finished row twice
+    assert len(local_page_server.responses) == 2
+
+
+def test_unreachable_pages_are_recorded_as_failures(tmp_path, local_page_server):
+    rows = {'Pokedex Number': [0], 'Link': [local_page_server('Missingno')], 'Variation': ['No Variation']}
+    store = CheckpointStore(str(tmp_path / 'run.jsonl'))
+
+    data = get_more_pokemon_data_checkpointed(rows, store, requests_per_second=100)
+
+    assert data['Pokemon'] == []
+    assert list(store.failed) == [(0, 'No Variation')]
@@ -0,0 +1,142 @@
+"""
+Tests for the driver pool, using a stand-in driver object instead of a browser
+"""
+
+import threading
+import time
+
+import pytest
+
+from driver_pool import DriverPool, get_more_pokemon_data_pooled
+
+ROWS = {'Pokedex Number': [19], 'Link': ['rattata'], 'Variation': ['No Variation']}
+
+
+class FakeDriver:
+    def __init__(self, hang=False, page_source=''):
+        self.quit_called = False
+        self.responsive = True
+        self.heap_size = 0
+        self.page_load_timeout = None
+        self.timeouts = []
+        self.hang = hang
+        self.page_source = page_source
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+        self.timeouts.append(seconds)
+
+    def get(self, link):
+        from selenium.common.exceptions import TimeoutException
+
+        if self.hang:
+            raise TimeoutException('page load hung')
+
+    def execute_script(self, script, *args):
+        if not self.responsive:
+            raise RuntimeError('browser is not answering')
+        if args:
+            # The selector registry's lookup: the first selector of every field matches
+            return [[0, f'<element {field[0]}>'] for field in args[0]]
+        return self.heap_size
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_drivers_are_reused_between_batches():
+    created = []
+    pool = DriverPool(factory=lambda: created.append(FakeDriver()) or created[-1], size=2)
+
+    with pool.driver() as first:
+        pass
+    with pool.driver() as second:
+        pass
+
+    assert first is second
+    assert len(created) == 1
+    assert first.page_load_timeout == 90
+
+
+def test_unhealthy_and_worn_out_drivers_are_recycled():
+    pool = DriverPool(factory=FakeDriver, size=1, max_pages=2, max_memory_mb=1)
+
+    with pool.driver() as driver:
+        driver.responsive = False
+    with pool.driver() as replacement:
+        replacement.heap_size = 2 * 1024 * 1024
+    with pool.driver() as third:
+        pass
+    with pool.driver() as fourth:
+        pass
+    with pool.driver() as fifth:
+        pass
+
+    assert driver.quit_called and replacement is not driver
+    assert replacement.quit_called and third is not replacement
+    # The third driver serves two pages (max_pages=2) and is then replaced
+    assert fourth is third and third.quit_called and fifth is not third
+    assert pool.recycled == 3
+
+
+def test_exception_while_in_use_recycles_the_driver():
+    pool = DriverPool(factory=FakeDriver, size=1)
+
+    with pytest.raises(TimeoutError):
+        with pool.driver() as driver:
+            raise TimeoutError('page load hung')
+
+    assert driver.quit_called
+    with pool.driver() as replacement:
+        assert replacement is not driver
+
+
+def test_pool_never_starts_more_than_size_drivers():
+    created = []
+    lock = threading.Lock()
+
+    def factory():
+        with lock:
+            created.append(FakeDriver())
+            return created[-1]
+
+    pool = DriverPool(factory=factory, size=2)
+
+    def work():
+        with pool.driver():
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 2
+    pool.close()
+    assert all(driver.quit_called for driver in created)
+
+
+def test_page_that_keeps_hanging_recycles_its_driver(monkeypatch):
+    pytest.importorskip('selenium')
+    monkeypatch.setattr('adaptive_wait.time.sleep', lambda seconds: None)
+    pool = DriverPool(factory=lambda: FakeDriver(hang=True), size=1)
+
+    data = get_more_pokemon_data_pooled(ROWS, pool, 0, 1)
+
+    assert data['Pokemon'] == []
+    assert pool.recycled == 1
+
+
+def test_learnt_page_load_timeouts_respect_the_pool_timeout(saved_page):
+    pytest.importorskip('selenium')
+    created = []
+    rattata = saved_page('Rattata')
+    pool = DriverPool(factory=lambda: created.append(FakeDriver(page_source=rattata)) or created[-1], size=1,
+                      page_load_timeout=15)
+
+    data = get_more_pokemon_data_pooled(ROWS, pool, 0, 1)
+
+    assert data['Pokemon'] == ['Rattata']
+    assert created[0].timeouts and max(created[0].timeouts) == 15
+    assert pool.recycled == 0
@@ -0,0 +1,90 @@
+"""
+Tests for indexed queries over the master dataset
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from master_index import MasterIndex, MasterQuery
+from master_store import MASTER_CSV
+
+MASTER = (
+    'Pokedex Number,Pokemon,HP,Attack,Speed,Variation,Type 1,Type 2,Height (m),Weight (kg),Generation\n'
+    '4,Charmander,39,52,65,,Fire,,0.6,8.5,1.0\n'
+    '6,Charizard,78,84,100,,Fire,Flying,1.7,90.5,1.0\n'
+    '6,Charizard,78,130,100,Mega Charizard X,Fire,Dragon,1.7,110.5,1.0\n'
+    '130,Gyarados,95,125,81,,Water,Flying,6.5,235.0,1.0\n'
+    '157,Typhlosion,78,84,100,,Fire,,1.7,79.5,2.0\n'
+    '384,Rayquaza,105,150,95,,Dragon,Flying,7.0,,3.0\n'
+)
+
+
+@pytest.fixture
+def master_csv(tmp_path):
+    path = tmp_path / 'pokemon_dataset_MASTER.csv'
+    path.write_text(MASTER, encoding='utf-8')
+    return str(path)
+
+
+def names(frame):
+    return list(zip(frame['Pokemon'], frame['Variation']))
+
+
+def test_equality_lookups_ignore_case_and_accept_several_values(master_csv):
+    master = MasterQuery(master_csv)
+
+    assert names(master.lookup('charizard')) == [('Charizard', 'No Variation'), ('Charizard', 'Mega Charizard X')]
+    assert len(master.query(equals={'Type 1': 'FIRE', 'Generation': [2, 3]})) == 1
+    assert master.query(equals={'Type 1': 'Ghost'}).empty
+
+
+def test_type_matches_either_type_column(master_csv):
+    dragons = MasterQuery(master_csv).query(equals={'Type': 'Dragon'})
+
+    assert names(dragons) == [('Charizard', 'Mega Charizard X'), ('Rayquaza', 'No Variation')]
+
+
+def test_ranges_are_inclusive_open_ended_and_skip_missing_values(master_csv):
+    master = MasterQuery(master_csv)
+
+    assert master.query(ranges={'Speed': (100, None)})['Pokemon'].tolist() == [
+        'Charizard', 'Charizard', 'Typhlosion']
+    assert master.query(ranges={'Weight (kg)': (None, 100)})['Pokemon'].tolist() == [
+        'Charmander', 'Charizard', 'Typhlosion']
+    assert master.query(equals={'Type': 'Flying'}, ranges={'Attack': (100, 140)},
+                        columns=['Pokemon'])['Pokemon'].tolist() == ['Gyarados']
+
+
+def test_index_matches_a_pandas_scan_on_the_real_master():
+    if not os.path.exists(MASTER_CSV):
+        pytest.skip('no MASTER csv')
+    master = MasterQuery()
+    frame = master.index.frame
+
+    expected = frame[((frame['Type 1'] == 'Water') | (frame['Type 2'] == 'Water'))
+                     & frame['Generation'].isin([1, 2]) & frame['Attack'].between(80, 120)]
+    result = master.query(equals={'Type': 'water', 'Generation': [1, 2]}, ranges={'Attack': (80, 120)})
+
+    assert result.index.tolist() == expected.index.tolist()
+
+
+def test_repeated_queries_are_cached_until_the_file_changes(master_csv):
+    master = MasterQuery(master_csv)
+    first = master.query(equals={'Type 1': 'Fire'})
+    first.loc[:, 'HP'] = 0
+    assert master.query(equals={'Type 1': 'Fire'})['HP'].tolist() == [39, 78, 78, 78]
+    assert (master.hits, master.misses) == (1, 1)
+
+    with open(master_csv, 'a', encoding='utf-8') as f:
+        f.write('155,Cyndaquil,39,52,65,,Fire,,0.5,7.9,2.0\n')
+
+    assert len(master.query(equals={'Type 1': 'Fire'})) == 5
+    assert master.misses == 2
+
+
+def test_master_index_positions_without_filters_cover_every_row():
+    frame = pd.DataFrame({'Pokemon': ['A', 'B'], 'HP': [1, 2]})
+
+    assert MasterIndex(frame).positions().tolist() == [0, 1]
@@ -0,0 +1,111 @@
+"""
+Tests for the columnar master dataset
+"""
+
+import math
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from checkpoint_store import row_key
+from master_store import MASTER_CSV, MasterStore, master_from_csv, normalize_frame
+from pokemon_html_parser import NO_VARIATION, iter_records_from_html, row_variations
+
+RATTATA = 'https://bulbapedia.bulbagarden.net/wiki/Rattata_(Pok%C3%A9mon)'
+
+
+def base_rows():
+    return {
+        'Pokedex Number': [19, 19, 20],
+        'Pokemon': ['Rattata', 'Rattata', 'Raticate'],
+        'Link': [RATTATA, RATTATA, 'https://example.invalid/Raticate'],
+        'HP': [30, 30, 55],
+        'Variation': [None, 'Alolan Rattata', 'No Variation'],
+        'Category': ['Mouse Pokémon', 'Mouse Pokémon', 'Mouse Pokémon'],
+        'Height (m)': [0.3, 0.3, 0.7],
+        'Weight (kg)': ['3.5', None, '18.5'],
+    }
+
+
+def test_normalize_frame_keys_and_types():
+    frame = normalize_frame(base_rows())
+
+    assert frame['Variation'].tolist() == [NO_VARIATION, 'Alolan Rattata', NO_VARIATION]
+    assert str(frame['Pokedex Number'].dtype) == 'int16'
+    assert str(frame['Weight (kg)'].dtype) == 'float32'
+
+    with pytest.raises(ValueError):
+        normalize_frame({'Pokedex Number': [1, 1], 'Variation': [None, 'No Variation']})
+
+
+def test_upsert_changes_only_supplied_columns_and_skips_noop_writes(tmp_path, saved_page):
+    store = MasterStore(str(tmp_path / 'master.parquet'))
+    store.write(base_rows())
+
+    link = RATTATA
+    rows = {'Pokedex Number': [19, 19], 'Link': [link, link], 'Variation': ['No Variation', 'Alolan Rattata']}
+    records = list(iter_records_from_html(rows, {link: saved_page('Rattata')}, 0, 2))
+
+    # both rows gain the Type columns; only the Alolan row's weight changes
+    assert store.upsert(records) == {'inserted': 0, 'updated': 2, 'unchanged': 0}
+    frame = store.load().set_index(['Pokedex Number', 'Variation'])
+    assert frame.loc[(19, 'Alolan Rattata'), 'Weight (kg)'] == pytest.approx(3.8)
+    assert frame.loc[(19, 'Alolan Rattata'), 'Type 1'] == 'Dark'
+    assert frame.loc[(19, 'Alolan Rattata'), 'HP'] == 30
+    assert frame.loc[(20, NO_VARIATION), 'Type 1'] != frame.loc[(20, NO_VARIATION), 'Type 1']
+
+    mtime = os.stat(store.path).st_mtime_ns
+    assert store.upsert(records) == {'inserted': 0, 'updated': 0, 'unchanged': 2}
+    assert os.stat(store.path).st_mtime_ns == mtime
+
+
+def test_upsert_inserts_new_keys(tmp_path):
+    store = MasterStore(str(tmp_path / 'master.parquet'))
+    assert store.upsert([{'Pokedex Number': 19, 'Variation': 'No Variation', 'HP': 30}])['inserted'] == 1
+
+    counts = store.upsert([{'Pokedex Number': 20, 'Variation': 'Alolan Raticate', 'HP': 75}])
+
+    assert counts['inserted'] == 1
+    assert store.load(['HP'])['HP'].tolist() == [30, 75]
+
+
+def test_load_is_column_pruned(tmp_path):
+    store = MasterStore(str(tmp_path / 'master.parquet'))
+    store.write(base_rows())
+
+    frame = store.load(['HP'])
+
+    assert list(frame.columns) == ['Pokedex Number', 'Variation', 'HP']
+    assert list(store.load(['HP'], keys=False).columns) == ['HP']
+    assert len(store.load(['HP'], filters=[('Pokedex Number', '=', 20)])) == 1
+
+
+def test_master_csv_imports_with_unique_keys():
+    if not os.path.exists(MASTER_CSV):
+        pytest.skip('no MASTER csv')
+
+    frame = master_from_csv()
+
+    lycanroc = frame[frame['Pokedex Number'] == 745]
+    assert lycanroc['Variation'].tolist() == ['Lycanroc Midday Form', 'Lycanroc Midnight Form',
+                                              'Lycanroc Dusk Form']
+    assert math.isclose(frame.loc[0, 'Weight (kg)'], 6.9, rel_tol=1e-6)
+    # A base form next to its variants keeps the usual key
+    charizard = frame[frame['Pokedex Number'] == 6]
+    assert charizard['Variation'].tolist() == ['No Variation', 'Mega Charizard X', 'Mega Charizard Y']
+
+
+def test_master_keys_match_the_keys_records_are_produced_with():
+    variations_csv = os.path.join(os.path.dirname(MASTER_CSV), 'pokemon_dataset_variations.csv')
+    if not os.path.exists(MASTER_CSV) or not os.path.exists(variations_csv):
+        pytest.skip('no MASTER or variations csv')
+
+    frame = master_from_csv()
+    rows = pd.read_csv(variations_csv)
+    produced = [row_key(dex, variation) for dex, variation in zip(rows['Pokedex Number'], row_variations(rows))]
+
+    assert len(set(produced)) == len(rows)
+    assert set(produced) == set(zip(frame['Pokedex Number'].astype(int), frame['Variation']))
@@ -0,0 +1,90 @@
+"""
+Tests for the on-disk page cache and its use by the fetcher
+"""
+
+import os
+import time
+
+from page_cache import PageCache
+from pokemon_fetcher import fetch_pages
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = PageCache(str(tmp_path))
+
+    assert cache.get('https://example.invalid/a') is None
+    cache.put('https://example.invalid/a', '<p>Pokémon</p>', etag='"abc"')
+
+    entry = cache.get('https://example.invalid/a')
+    assert entry.html == '<p>Pokémon</p>'
+    assert entry.etag == '"abc"'
+    assert entry.fresh
+
+
+def test_entries_go_stale_after_ttl(tmp_path):
+    cache = PageCache(str(tmp_path), ttl=0)
+    cache.put('https://example.invalid/a', 'old')
+
+    assert not cache.get('https://example.invalid/a').fresh
+
+
+def test_evict_removes_least_recently_used_pages(tmp_path):
+    cache = PageCache(str(tmp_path))
+    for name in ('a', 'b', 'c'):
+        cache.put(f'https://example.invalid/{name}', name * 2000)
+
+    # Age every page, then read 'a' so that 'b' becomes the least recently used
+    past = time.time() - 100
+    for i, (_, _, path) in enumerate(sorted(cache._entries(), key=lambda e: e[2])):
+        os.utime(path, (past + i, past + i))
+    cache.get('https://example.invalid/a')
+    cache.max_bytes = cache.size() - 1
+
+    assert cache.evict() == 1
+    remaining = {name for name in 'abc' if cache.get(f'https://example.invalid/{name}')}
+    assert len(remaining) == 2 and 'a' in remaining
+
+
+def test_fetch_pages_serves_fresh_pages_from_cache(tmp_path, local_page_server):
+    cache = PageCache(str(tmp_path))
+    url = local_page_server('Rattata')
+
+    first = fetch_pages([url], cache=cache, requests_per_second=100)
+    second = fetch_pages([url], cache=cache, requests_per_second=100)
+
+    assert first == second
+    assert [code for _, code in local_page_server.responses] == [200]
+
+
+def test_stale_pages_are_revalidated_with_last_modified(tmp_path, local_page_server):
+    cache = PageCache(str(tmp_path), ttl=0)
+    url = local_page_server('Deoxys')
+
+    first = fetch_pages([url], cache=cache, requests_per_second=100)
+    second = fetch_pages([url], cache=cache, requests_per_second=100)
+
+    assert first == second
+    assert [code for _, code in local_page_server.responses] == [200, 304]
+
+
+def test_offline_mode_never_touches_the_network(tmp_path, local_page_server):
+    cache = PageCache(str(tmp_path), ttl=0)
+    url = local_page_server('Venusaur')
+    fetch_pages([url], cache=cache, requests_per_second=100)
+
+    pages = fetch_pages([url, local_page_server('Charizard')], cache=cache, offline=True)
+
+    assert list(pages) == [url]
+    assert len(local_page_server.responses) == 1
+
+
+def test_expire_forces_revalidation(tmp_path, local_page_server):
+    cache = PageCache(str(tmp_path))
+    url = local_page_server('Rattata')
+    fetch_pages([url], cache=cache, requests_per_second=100)
+
+    cache.expire(url)
+    assert not cache.get(url).fresh
+    fetch_pages([url], cache=cache, requests_per_second=100)
+
+    assert [code for _, code in local_page_server.responses] == [200, 304]
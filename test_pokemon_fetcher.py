@@ -0,0 +1,51 @@
+"""
+Tests for the concurrent page fetcher, run against a local server for pokemonLinks_html/
+"""
+
+import time
+
+from pokemon_fetcher import HostRateLimiter, fetch_pages, get_more_pokemon_data_concurrent
+
+
+def test_fetch_pages_downloads_each_url_once(local_page_server):
+    urls = [local_page_server(name) for name in ('Charizard', 'Deoxys', 'Rattata', 'Venusaur')]
+
+    pages = fetch_pages(urls + urls[:2], workers=4, requests_per_second=100)
+
+    assert set(pages) == set(urls)
+    assert '<big><big><b>Deoxys</b></big></big>' in pages[urls[1]]
+
+
+def test_fetch_pages_leaves_out_failed_urls(local_page_server):
+    good = local_page_server('Rattata')
+    missing = local_page_server('Missingno')
+
+    pages = fetch_pages([good, missing], workers=2, requests_per_second=100)
+
+    assert list(pages) == [good]
+
+
+def test_host_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(requests_per_second=50)
+
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.wait('http://example.invalid/page')
+    limiter.wait('http://other.invalid/page')
+    elapsed = time.monotonic() - started
+
+    # Five intervals of 20 ms for the first host; the second host is not delayed
+    assert 0.09 <= elapsed < 0.5
+
+
+def test_get_more_pokemon_data_concurrent_feeds_the_parser(local_page_server):
+    rows = {
+        'Link': [local_page_server('Venusaur'), local_page_server('Venusaur'), local_page_server('Rattata')],
+        'Variation': ['No Variation', 'Mega Venusaur', 'Alolan Rattata'],
+    }
+
+    data = get_more_pokemon_data_concurrent(rows, 0, 3, workers=3, requests_per_second=100)
+
+    assert data['Pokemon'] == ['Venusaur', 'Venusaur', 'Rattata']
+    assert data['Height (m)'] == ['2.0 m', '2.4 m', '0.3 m']
+    assert data['Weight (kg)'] == ['100.0 kg', '155.5 kg', '3.8 kg']
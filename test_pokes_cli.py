@@ -0,0 +1,123 @@
+"""
+Tests for the pokes_cli command-line entry point
+"""
+
+import csv
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pokes_cli
+from saved_pages import HTML_DIR
+
+CLI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pokes_cli.py')
+
+
+@pytest.fixture
+def rows_csv(tmp_path, local_page_server):
+    charizard, rattata = local_page_server('Charizard'), local_page_server('Rattata')
+    path = tmp_path / 'rows.csv'
+    path.write_text(
+        'Pokedex Number,Pokemon,Link,Variation\n'
+        f'6,Charizard,{charizard},No Variation\n'
+        f'6,Charizard,{charizard},Mega Charizard X\n'
+        f'19,Rattata,{rattata},\n',
+        encoding='utf-8',
+    )
+    return str(path)
+
+
+def run(tmp_path, *argv):
+    return pokes_cli.main(['--lock', str(tmp_path / 'cli.lock'), *argv])
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_cache_only_commands_do_not_import_heavy_modules(tmp_path):
+    script = (
+        'import sys, pokes_cli\n'
+        f'status = pokes_cli.main(["--lock", {str(tmp_path / "cli.lock")!r}, "fetch", "--offline", '
+        f'"--cache-dir", {str(tmp_path / "cache")!r}, "--end", "3"])\n'
+        'print(sorted(name for name in ("pandas", "numpy", "selenium") if name in sys.modules))\n'
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(CLI),
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_load_rows_reads_a_batch_without_pandas(rows_csv):
+    rows = pokes_cli.load_rows(rows_csv, start=1)
+
+    assert rows['Pokedex Number'] == [6, 19]
+    assert rows['Variation'] == ['Mega Charizard X', None]
+
+
+def test_fetch_then_extract_from_the_cache(tmp_path, rows_csv):
+    cache_dir = str(tmp_path / 'cache')
+    out = str(tmp_path / 'records.csv')
+
+    # Nothing is cached yet, so an offline run reports the pages as missing
+    assert run(tmp_path, 'fetch', '--rows', rows_csv, '--cache-dir', cache_dir, '--offline') == 1
+    assert run(tmp_path, 'fetch', '--rows', rows_csv, '--cache-dir', cache_dir) == 0
+    assert run(tmp_path, 'extract', '--rows', rows_csv, '--cache-dir', cache_dir, '--csv', out) == 0
+
+    records = read_csv(out)
+    assert [(r['Pokedex Number'], r['Pokemon']) for r in records] == [
+        ('6', 'Charizard'), ('6', 'Charizard'), ('19', 'Rattata')]
+    assert records[1]['Weight (kg)'].startswith('110.5')
+
+
+def test_extract_from_a_saved_corpus(tmp_path):
+    rows = tmp_path / 'rows.csv'
+    rows.write_text('Pokedex Number,Link,Variation\n3,unused,No Variation\n19,unused,No Variation\n',
+                    encoding='utf-8')
+    out = str(tmp_path / 'records.csv')
+
+    assert run(tmp_path, 'extract', '--rows', str(rows), '--corpus', HTML_DIR, '--processes', '1', '--csv', out) == 0
+    assert [r['Pokemon'] for r in read_csv(out)] == ['Venusaur', 'Rattata']
+
+
+def test_extract_exit_status_counts_keys_not_rows(tmp_path):
+    rows = tmp_path / 'rows.csv'
+    out = str(tmp_path / 'records.csv')
+    # The same key twice: a saved corpus yields one record for both rows
+    rows.write_text('Pokedex Number,Link,Variation\n19,unused,No Variation\n19,unused,\n', encoding='utf-8')
+    assert run(tmp_path, 'extract', '--rows', str(rows), '--corpus', HTML_DIR, '--processes', '1', '--csv', out) == 0
+
+    # No saved page for 25
+    rows.write_text('Pokedex Number,Link,Variation\n19,unused,No Variation\n25,unused,\n', encoding='utf-8')
+    assert run(tmp_path, 'extract', '--rows', str(rows), '--corpus', HTML_DIR, '--processes', '1', '--csv', out) == 1
+
+
+def test_extract_upserts_into_the_master_file(tmp_path):
+    pytest.importorskip('pyarrow')
+    from master_store import MasterStore
+
+    rows = tmp_path / 'rows.csv'
+    rows.write_text('Pokedex Number,Link,Variation\n19,unused,No Variation\n', encoding='utf-8')
+    master = str(tmp_path / 'master.parquet')
+
+    assert run(tmp_path, 'extract', '--rows', str(rows), '--corpus', HTML_DIR, '--processes', '1',
+               '--master', master) == 0
+    assert MasterStore(master).load(columns=['Pokemon'])['Pokemon'].tolist() == ['Rattata']
+
+
+def test_extract_needs_an_output(tmp_path, rows_csv):
+    with pytest.raises(SystemExit):
+        run(tmp_path, 'extract', '--rows', rows_csv)
+
+
+def test_overlapping_run_exits_with_tempfail(tmp_path, rows_csv):
+    pytest.importorskip('fcntl')
+    lock_file = pokes_cli.acquire_lock(str(tmp_path / 'cli.lock'))
+    try:
+        assert run(tmp_path, 'fetch', '--rows', rows_csv, '--offline',
+                   '--cache-dir', str(tmp_path / 'cache')) == pokes_cli.EXIT_LOCKED
+    finally:
+        lock_file.close()
@@ -0,0 +1,83 @@
+"""
+Tests for streamed records and their sinks
+"""
+
+import csv
+
+import pytest
+
+from checkpoint_store import CheckpointStore
+from pokemon_html_parser import iter_records_from_html
+from record_sinks import CsvSink, FrameSink, stream_records
+
+CHARIZARD = 'https://bulbapedia.bulbagarden.net/wiki/Charizard_(Pok%C3%A9mon)'
+DEOXYS = 'https://bulbapedia.bulbagarden.net/wiki/Deoxys_(Pok%C3%A9mon)'
+
+ROWS = {
+    'Pokedex Number': [6, 6, 0, 386],
+    'Link': [CHARIZARD, CHARIZARD, 'https://example.invalid/missing', DEOXYS],
+    'Variation': ['No Variation', 'Mega Charizard Y', 'No Variation', 'Attack Forme'],
+}
+
+
+@pytest.fixture
+def pages(saved_page):
+    return {CHARIZARD: saved_page('Charizard'), DEOXYS: saved_page('Deoxys')}
+
+
+def test_records_are_yielded_lazily_and_complete(pages):
+    records = iter_records_from_html(ROWS, pages, 0, 4)
+
+    first = next(records)
+    assert first['Pokedex Number'] == 6 and first['Variation'] == 'No Variation'
+    assert first['Weight (kg)'] == '90.5 kg'
+
+    rest = list(records)
+    assert [r['Variation'] for r in rest] == ['Mega Charizard Y', 'Attack Forme']
+    # Deoxys has no type 2: the record still has every field
+    assert rest[-1]['Type 2'] != rest[-1]['Type 2']
+
+
+def test_stream_records_feeds_every_sink(tmp_path, pages):
+    csv_path = tmp_path / 'more_pokes.csv'
+    store = CheckpointStore(str(tmp_path / 'run.jsonl'))
+
+    count = stream_records(iter_records_from_html(ROWS, pages, 0, 4), CsvSink(str(csv_path)), store)
+
+    assert count == 3
+    assert store.completed == {(6, 'No Variation'), (6, 'Mega Charizard Y'), (386, 'Attack Forme')}
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['Weight (kg)'] for row in rows] == ['90.5 kg', '100.5 kg', '60.8 kg']
+    assert rows[2]['Type 2'] == ''
+
+
+def test_csv_sink_appends_without_repeating_the_header(tmp_path, pages):
+    csv_path = str(tmp_path / 'more_pokes.csv')
+    stream_records(iter_records_from_html(ROWS, pages, 0, 1), CsvSink(csv_path))
+    stream_records(iter_records_from_html(ROWS, pages, 1, 2), CsvSink(csv_path))
+
+    with open(csv_path, encoding='utf-8') as f:
+        assert sum(line.startswith('Pokedex Number') for line in f) == 1
+
+
+def test_frame_sink_builds_a_typed_frame(pages):
+    sink = FrameSink()
+
+    stream_records(iter_records_from_html(ROWS, pages, 0, 4), sink)
+
+    frame = sink.frame()
+    assert frame['Weight (kg)'].tolist() == pytest.approx([90.5, 100.5, 60.8])
+    assert str(frame['Pokedex Number'].dtype) == 'int16'
+
+
+def test_parquet_sink_writes_row_groups(tmp_path, pages):
+    pq = pytest.importorskip('pyarrow.parquet')
+    from record_sinks import ParquetSink
+
+    path = str(tmp_path / 'more_pokes.parquet')
+    stream_records(iter_records_from_html(ROWS, pages, 0, 4), ParquetSink(path, row_group_size=2))
+
+    table = pq.read_table(path)
+    assert table.num_rows == 3
+    assert pq.ParquetFile(path).num_row_groups == 2
@@ -0,0 +1,61 @@
+"""
+Tests for scrape run metrics
+"""
+
+import json
+
+import pytest
+
+from pokemon_html_parser import iter_records_from_html
+from scrape_metrics import Histogram, RunMetrics
+
+VENUSAUR = 'https://bulbapedia.bulbagarden.net/wiki/Venusaur_(Pok%C3%A9mon)'
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = Histogram(buckets=(0.01, 0.1, 1, float('inf')))
+    for seconds in (0.005, 0.05, 0.05, 0.5, 30):
+        histogram.observe(seconds)
+
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.percentile(50) == 0.1
+    assert histogram.percentile(100) == 30
+    assert histogram.to_dict()['buckets']['inf'] == 1
+
+
+def test_stage_times_blocks_and_counts_errors():
+    metrics = RunMetrics()
+
+    with metrics.stage('page_load'):
+        pass
+    with pytest.raises(TimeoutError):
+        with metrics.stage('page_load'):
+            raise TimeoutError
+
+    assert metrics.histograms['page_load'].count == 2
+    assert metrics.counters == {'page_load.errors': 1}
+
+
+def test_extraction_reports_stages_fallbacks_and_rates(tmp_path, capsys, saved_page):
+    metrics = RunMetrics()
+    rows = {'Link': [VENUSAUR] * 3 + ['https://example.invalid/missing'],
+            'Variation': ['No Variation', 'Mega Venusaur', 'Primal Venusaur', 'No Variation']}
+
+    records = list(iter_records_from_html(rows, {VENUSAUR: saved_page('Venusaur')}, 0, 4, metrics))
+
+    assert len(records) == 3
+    summary = metrics.summary()
+    assert summary['counters']['records'] == 3
+    assert summary['counters']['sizes.fallback'] == 1
+    # Venusaur's type columns carry no labels, so every non-base form falls back
+    assert summary['counters']['types.fallback'] == 2
+    assert summary['counters']['rows.failed'] == 1
+    assert summary['stages']['parse']['count'] == 1
+    assert summary['stages']['sizes']['count'] == 3
+    assert summary['rates']['sizes_fallback'] == pytest.approx(1 / 3)
+    assert summary['rates']['row_failure'] == pytest.approx(1 / 4)
+
+    path = tmp_path / 'run_metrics.json'
+    metrics.write_json(str(path))
+    assert json.loads(path.read_text(encoding='utf-8'))['counters']['records'] == 3
+    assert 'sizes_fallback rate' in metrics.format_summary()
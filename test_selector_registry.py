@@ -0,0 +1,86 @@
+"""
+Tests for the ranked infobox selector registry
+"""
+
+import os
+
+import pytest
+
+from saved_pages import HTML_DIR
+from selector_registry import FIELD_SELECTORS, SelectorRegistry
+
+
+class FakeDriver:
+    """Answers the lookup script from a set of XPaths that 'match' on the current page"""
+
+    def __init__(self, matching=()):
+        self.matching = set(matching)
+        self.scripts = []
+
+    def execute_script(self, script, fields):
+        self.scripts.append(fields)
+        results = []
+        for xpaths in fields:
+            hit = next(([i, f'<element {xpath}>'] for i, xpath in enumerate(xpaths) if xpath in self.matching), None)
+            results.append(hit)
+        return results
+
+
+def test_first_matching_selector_wins_in_one_round_trip():
+    registry = SelectorRegistry({'height': ['//a', '//b', '//c']})
+    driver = FakeDriver(matching={'//b', '//c'})
+
+    assert registry.find(driver, 'height') == '<element //b>'
+    assert driver.scripts == [[['//a', '//b', '//c']]]
+
+
+def test_selector_that_hit_moves_to_the_front():
+    registry = SelectorRegistry({'height': ['//a', '//b', '//c']})
+    driver = FakeDriver(matching={'//c'})
+
+    registry.find(driver, 'height')
+    registry.find(driver, 'height')
+
+    assert driver.scripts[1] == [['//c', '//a', '//b']]
+    assert registry.stats()['height'] == {'selectors': [('//c', 2), ('//a', 0), ('//b', 0)], 'misses': 0}
+
+
+def test_miss_returns_none_after_one_evaluation():
+    registry = SelectorRegistry({'weight': ['//a', '//b']})
+    driver = FakeDriver()
+
+    assert registry.find(driver, 'weight') is None
+    assert len(driver.scripts) == 1
+    assert registry.stats()['weight']['misses'] == 1
+    # Misses leave the ranking alone
+    assert [xpath for xpath, _ in registry.stats()['weight']['selectors']] == ['//a', '//b']
+
+
+def test_find_many_looks_up_every_field_at_once():
+    registry = SelectorRegistry({'height': ['//h1', '//h2'], 'weight': ['//w'], 'types': ['//t']})
+    driver = FakeDriver(matching={'//h2', '//w'})
+
+    found = registry.find_many(driver, ['height', 'weight', 'types'])
+
+    assert found == {'height': '<element //h2>', 'weight': '<element //w>', 'types': None}
+    assert len(driver.scripts) == 1
+
+
+def test_present_is_a_wait_condition():
+    registry = SelectorRegistry({'name': ['//name']})
+
+    assert registry.present('name')(FakeDriver()) is False
+    assert registry.present('name')(FakeDriver(matching={'//name'})) == '<element //name>'
+
+
+@pytest.mark.parametrize('pokemon', ['Charizard', 'Deoxys', 'Rattata', 'Venusaur'])
+def test_every_default_selector_matches_the_saved_pages(pokemon):
+    lxml_html = pytest.importorskip('lxml.html')
+    document = lxml_html.parse(os.path.join(HTML_DIR, f'{pokemon}_(Pokémon).html'))
+
+    for field, xpaths in FIELD_SELECTORS.items():
+        for xpath in xpaths:
+            assert document.xpath(xpath), (field, xpath)
+
+    name = document.xpath(FIELD_SELECTORS['name'][0])[0]
+    assert name.text_content().strip() == pokemon
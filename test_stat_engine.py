@@ -0,0 +1,88 @@
+"""
+Tests for the vectorized derived-stat engine
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stat_engine import StatEngine
+
+ROWS = pd.DataFrame({
+    'Pokedex Number': [6, 6, 6, 130, 157, 19, 19],
+    'Variation': ['No Variation', 'Mega Charizard X', 'Mega Charizard Y', 'No Variation', 'No Variation',
+                  'No Variation', 'Alolan Rattata'],
+    'Type 1': ['Fire', 'Fire', 'Fire', 'Water', 'Fire', 'Normal', 'Dark'],
+    'Type 2': ['Flying', 'Dragon', 'Flying', 'Flying', None, None, 'Normal'],
+    'Generation': [1.0, 1.0, 1.0, 1.0, 2.0, 1.0, 1.0],
+    'HP': [78, 78, 78, 95, 78, 30, 30],
+    'Attack': [84, 130, 104, 125, 84, 56, 56],
+    'Defense': [78, 111, 78, 79, 78, 35, 35],
+    'Speed': [100, 100, 100, 81, 100, 72, 72],
+    'Special Attack': [109, 130, 159, 60, 109, 25, 25],
+    'Special Defense': [85, 85, 115, 100, 85, 35, 35],
+    'Stat Total': [534, 634, 634, 540, 534, 253, 253],
+    'Height (m)': [1.7, 1.7, 1.7, 6.5, 1.7, 0.3, 0.3],
+    'Weight (kg)': [90.5, 110.5, 100.5, 235.0, 79.5, 3.5, np.nan],
+})
+
+
+@pytest.fixture
+def engine():
+    return StatEngine(ROWS)
+
+
+def test_derived_ratios(engine):
+    derived = engine.derived()
+
+    assert derived.loc[0, 'BMI'] == pytest.approx(90.5 / 1.7 ** 2)
+    assert derived.loc[1, 'Attack/Defense'] == pytest.approx(130 / 111)
+    assert derived.loc[3, 'Offense/Defense'] == pytest.approx(185 / 179)
+    assert math.isnan(derived.loc[6, 'BMI'])
+
+
+@pytest.mark.parametrize('by', ['Type 1', 'Type 2', 'Generation'])
+def test_percentiles_match_pandas_rank(engine, by):
+    columns = list(engine.columns)
+    expected = ROWS.groupby(by)[columns].rank(pct=True, method='min') * 100
+
+    result = engine.percentiles(by)
+
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(dtype=float, na_value=np.nan))
+
+
+def test_zscores_match_pandas_groupby(engine):
+    values = ROWS[list(engine.columns)].astype(float)
+    groups = values.groupby(ROWS['Generation'])
+    expected = (values - groups.transform('mean')) / groups.transform(lambda s: s.std(ddof=0))
+
+    result = engine.zscores('Generation')
+
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+def test_variant_deltas_are_relative_to_the_base_form(engine):
+    deltas = engine.variant_deltas(['Attack', 'Weight (kg)'])
+
+    assert deltas['Attack'].tolist()[:3] == [0, 46, 20]
+    assert deltas.loc[2, 'Weight (kg)'] == pytest.approx(10.0)
+    # The subset has no base row for Rattata
+    subset = engine.take(np.array([0, 1, 6]))
+    assert math.isnan(subset.variant_deltas(['Attack']).loc[6, 'Attack'])
+
+
+def test_similarity_and_nearest_neighbours(engine):
+    similarity = engine.similarity()
+    assert similarity.shape == (7, 7)
+    np.testing.assert_allclose(np.diag(similarity), 1.0)
+
+    neighbours, distances = engine.nearest(k=2)
+    # Typhlosion and Charizard share every base stat
+    assert neighbours[4, 0] == 0 and distances[4, 0] == pytest.approx(0, abs=1e-6)
+    assert 6 in neighbours[5] and 5 not in neighbours[5]
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+    only_rattata, _ = engine.nearest(k=1, positions=[5])
+    assert only_rattata.tolist() == [[6]]
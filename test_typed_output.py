@@ -0,0 +1,52 @@
+"""
+Tests for typed columnar output
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from typed_output import get_more_pokemon_data_typed, parse_measure, to_typed_frame
+
+
+def test_parse_measure_is_vectorized_over_unit_strings():
+    values = parse_measure(['1.7 m', '28.0+ m', '??? m', None], r'(\d+(?:\.\d+)?)\+?\s*m\b')
+
+    assert values.dtype == np.float32
+    assert values[:2].tolist() == pytest.approx([1.7, 28.0])
+    assert math.isnan(values[2]) and math.isnan(values[3])
+
+
+def test_to_typed_frame_sets_compact_dtypes():
+    data = {
+        'Pokedex Number': ['0006', '0006'],
+        'Variation': ['No Variation', 'Mega Charizard X'],
+        'Pokemon': ['Charizard', 'Charizard'],
+        'Category': ['Flame Pokémon', 'Flame Pokémon'],
+        'Type 1': ['Fire', 'Fire'],
+        'Type 2': ['Flying', 'Dragon'],
+        'Height (m)': ['1.7 m', '1.7 m'],
+        'Weight (kg)': ['90.5 kg', '110.5 kg'],
+    }
+
+    frame = to_typed_frame(data)
+
+    assert frame['Pokedex Number'].dtype == np.int16
+    assert frame['Height (m)'].dtype == np.float32
+    assert frame['Weight (kg)'].tolist() == pytest.approx([90.5, 110.5])
+    assert isinstance(frame['Type 2'].dtype, pd.CategoricalDtype)
+    assert isinstance(frame['Category'].dtype, pd.CategoricalDtype)
+
+
+def test_get_more_pokemon_data_typed_keeps_row_keys(saved_page):
+    link = 'https://bulbapedia.bulbagarden.net/wiki/Rattata_(Pok%C3%A9mon)'
+    rows = pd.DataFrame({'Pokedex Number': [19, 19], 'Link': [link, link],
+                         'Variation': ['No Variation', 'Alolan Rattata']})
+
+    frame = get_more_pokemon_data_typed(rows, {link: saved_page('Rattata')}, 0, 2)
+
+    assert frame['Variation'].tolist() == ['No Variation', 'Alolan Rattata']
+    assert frame['Weight (kg)'].tolist() == pytest.approx([3.5, 3.8])
+    assert frame['Type 1'].tolist() == ['Normal', 'Dark']
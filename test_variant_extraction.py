@@ -3,6 +3,130 @@ Test cases to verify the variant extraction fix
 This demonstrates that the function should extract correct variant-specific data
 """
 
+import pytest
+
+import pokemon_html_parser
+from pokemon_html_parser import (
+    extract_variant_record,
+    get_more_pokemon_data_from_html,
+    group_variations_by_link,
+    infobox_html,
+    parse_pokemon_page,
+    row_variations,
+)
+from saved_pages import EXPECTED_VARIANTS, load_saved_page
+
+
+@pytest.mark.parametrize('case', EXPECTED_VARIANTS, ids=lambda c: f"{c['Pokemon']}-{c['Variant']}")
+def test_offline_parser_matches_expected_values(case):
+    page = parse_pokemon_page(load_saved_page(case['Pokemon']))
+    record = extract_variant_record(page, case['Variant'])
+
+    assert record['Pokemon'] == case['Pokemon']
+    assert record['Height (m)'] == case['Expected_Height']
+    assert record['Weight (kg)'] == case['Expected_Weight']
+
+
+def test_offline_parser_reads_category_and_variant_types():
+    page = parse_pokemon_page(load_saved_page('Charizard'))
+
+    assert page.category == 'Flame Pokémon'
+    assert page.dex_number == 6
+    record = extract_variant_record(page, 'Mega Charizard X')
+    assert (record['Type 1'], record['Type 2']) == ('Fire', 'Dragon')
+    assert page.variant_types('Mega Charizard Y') == ('Fire', 'Flying')
+    assert page.variant_sizes('Mega Charizard Y') == ('1.7 m', '100.5 kg')
+
+    rattata = parse_pokemon_page(load_saved_page('Rattata'))
+    base = extract_variant_record(rattata, 'No Variation')
+    assert base['Type 1'] == 'Normal'
+    assert base['Type 2'] != base['Type 2']  # NaN: hidden second type
+    alolan = extract_variant_record(rattata, 'Alolan Rattata')
+    assert (alolan['Type 1'], alolan['Type 2']) == ('Dark', 'Normal')
+
+
+def test_size_table_maps_every_variant_from_one_pass():
+    sizes = parse_pokemon_page(load_saved_page('Charizard')).sizes
+
+    assert sizes.labels == ['Charizard', 'Mega Charizard X', 'Mega Charizard Y', 'Gigantamax Charizard']
+    assert sizes.by_label['Mega Charizard X'] == ['1.7 m', '110.5 kg']
+
+    # Rattata hides its height rows (shared by all forms) but shows per-form weights
+    rattata = parse_pokemon_page(load_saved_page('Rattata'))
+    assert rattata.sizes.labels == ['Rattata', 'Alolan Rattata']
+    assert rattata.sizes.lookup('Alolan Rattata', rattata.matcher('sizes'), 'Rattata') == ('0.3 m', '3.8 kg')
+    assert rattata.sizes.base_sizes('Rattata') == ('0.3 m', '3.5 kg')
+
+
+def test_get_more_pokemon_data_from_html_returns_column_lists():
+    link = 'https://bulbapedia.bulbagarden.net/wiki/Charizard_(Pok%C3%A9mon)'
+    rows = {
+        'Link': [link, link, 'https://example.invalid/missing'],
+        'Variation': ['No Variation', 'Mega Charizard Y', 'No Variation'],
+    }
+
+    data = get_more_pokemon_data_from_html(rows, {link: load_saved_page('Charizard')}, 0, 3)
+
+    assert list(data) == ['Pokemon', 'Category', 'Type 1', 'Type 2', 'Height (m)', 'Weight (kg)']
+    assert data['Pokemon'] == ['Charizard', 'Charizard']
+    assert data['Weight (kg)'] == ['90.5 kg', '100.5 kg']
+
+
+def test_each_page_is_parsed_once_for_all_of_its_variants(monkeypatch):
+    charizard = 'https://bulbapedia.bulbagarden.net/wiki/Charizard_(Pok%C3%A9mon)'
+    rattata = 'https://bulbapedia.bulbagarden.net/wiki/Rattata_(Pok%C3%A9mon)'
+    rows = {
+        'Link': [charizard, rattata, charizard, charizard, rattata],
+        'Variation': ['No Variation', 'No Variation', 'Mega Charizard X', 'Mega Charizard Y', 'Alolan Rattata'],
+    }
+    pages = {charizard: load_saved_page('Charizard'), rattata: load_saved_page('Rattata')}
+
+    parsed = []
+    real_parse = pokemon_html_parser.parse_pokemon_page
+    monkeypatch.setattr(pokemon_html_parser, 'parse_pokemon_page',
+                        lambda html: parsed.append(html) or real_parse(html))
+
+    data = get_more_pokemon_data_from_html(rows, pages, 0, 5)
+
+    assert len(parsed) == 2
+    assert data['Pokemon'] == ['Charizard', 'Rattata', 'Charizard', 'Charizard', 'Rattata']
+    assert data['Weight (kg)'] == ['90.5 kg', '3.5 kg', '110.5 kg', '100.5 kg', '3.8 kg']
+
+
+def test_group_variations_by_link_keeps_row_positions():
+    rows = {'Link': ['a', 'b', 'a', 'c'], 'Variation': ['No Variation', 'x', 'y', 'z']}
+
+    groups = group_variations_by_link(rows, 1, 4)
+
+    assert groups == {'b': [(0, 'x')], 'a': [(1, 'y')], 'c': [(2, 'z')]}
+
+
+def test_row_variations_key_forms_listed_as_separate_base_rows():
+    rows = {'Pokedex Number': [6, 6, 745, 745, 19], 'Link': ['c', 'c', 'l', 'l', 'r'],
+            'Pokemon': ['Charizard', 'Charizard', 'Lycanroc Midday Form', 'Lycanroc Dusk Form', 'Rattata'],
+            'Variation': ['No Variation', 'Mega Charizard X', None, 'No Variation', float('nan')]}
+
+    assert row_variations(rows)[:4] == ['No Variation', 'Mega Charizard X', 'Lycanroc Midday Form',
+                                        'Lycanroc Dusk Form']
+    # Keys come from the whole frame, so a batch holding one Lycanroc form still names it
+    assert group_variations_by_link(rows, 3, 4) == {'l': [(0, 'Lycanroc Dusk Form')]}
+
+
+def test_parse_pokemon_page_rejects_pages_without_infobox():
+    with pytest.raises(ValueError):
+        parse_pokemon_page('<html><body><p>Not a species page</p></body></html>')
+
+
+def test_infobox_html_holds_everything_the_parser_reads():
+    html = load_saved_page('Charizard')
+    infobox = infobox_html(html)
+
+    assert infobox.startswith('<table') and infobox.endswith('</table>')
+    assert 'wgRequestId' not in infobox
+    assert parse_pokemon_page(infobox) == parse_pokemon_page(html)
+    assert infobox_html('<html><body></body></html>') is None
+
+
 def test_variant_extraction():
     """
     Test the expected behavior for variant data extraction
@@ -11,63 +135,10 @@ def test_variant_extraction():
     print("Testing Variant Data Extraction")
     print("=" * 60)
 
-    # Expected values based on the HTML files
-    test_cases = [
-        {
-            "Pokemon": "Charizard",
-            "Variant": "No Variation",
-            "Expected_Height": "1.7 m",
-            "Expected_Weight": "90.5 kg",
-            "Notes": "Base form Charizard"
-        },
-        {
-            "Pokemon": "Charizard",
-            "Variant": "Mega Charizard X",
-            "Expected_Height": "1.7 m",
-            "Expected_Weight": "110.5 kg",
-            "Notes": "Mega X has same height but different weight"
-        },
-        {
-            "Pokemon": "Charizard",
-            "Variant": "Mega Charizard Y",
-            "Expected_Height": "1.7 m",
-            "Expected_Weight": "100.5 kg",
-            "Notes": "Mega Y has same height but different weight"
-        },
-        {
-            "Pokemon": "Venusaur",
-            "Variant": "Mega Venusaur",
-            "Expected_Height": "2.4 m",
-            "Expected_Weight": "155.5 kg",
-            "Notes": "Mega Venusaur has different height and weight from base"
-        },
-        {
-            "Pokemon": "Rattata",
-            "Variant": "No Variation",
-            "Expected_Height": "0.3 m",
-            "Expected_Weight": "3.5 kg",
-            "Notes": "Base form Rattata"
-        },
-        {
-            "Pokemon": "Rattata",
-            "Variant": "Alolan Rattata",
-            "Expected_Height": "0.3 m",
-            "Expected_Weight": "3.8 kg",
-            "Notes": "Alolan has same height but different weight"
-        },
-        {
-            "Pokemon": "Deoxys",
-            "Variant": "Defense Form",
-            "Expected_Height": "1.7 m",
-            "Expected_Weight": "60.8 kg",
-            "Notes": "All Deoxys forms share the same height/weight"
-        }
-    ]
-
     print("\nExpected Values from Bulbapedia HTML Files:")
     print("-" * 60)
 
-    for i, test in enumerate(test_cases, 1):
+    for i, test in enumerate(EXPECTED_VARIANTS, 1):
         print(f"\nTest Case {i}: {test['Pokemon']} - {test['Variant']}")
         print(f"  Expected Height: {test['Expected_Height']}")
         print(f"  Expected Weight: {test['Expected_Weight']}")
@@ -0,0 +1,47 @@
+"""
+Tests for the precompiled variant-name matcher
+"""
+
+from variant_matcher import VariantMatcher, label_tokens
+
+
+def test_label_tokens_fold_aliases_and_nbsp():
+    assert label_tokens('Mega\xa0Charizard\xa0Y') == ('mega', 'charizard', 'y')
+    assert label_tokens('Alola Form') == ('alolan', 'form')
+    assert label_tokens('Defense Forme') == ('defense', 'form')
+
+
+def test_mega_x_and_y_never_cross():
+    matcher = VariantMatcher(['Charizard', 'Mega Charizard X', 'Mega Charizard Y', 'Gigantamax Charizard'],
+                             'Charizard')
+
+    assert matcher.match_all(['Mega Charizard Y', 'Mega Charizard X', 'Charizard']) == [2, 1, 0]
+
+
+def test_base_label_is_not_a_fuzzy_match_for_variants():
+    matcher = VariantMatcher(['Rattata', 'Alolan Rattata'], 'Rattata')
+
+    assert matcher.match('Alola Rattata') == 1
+    assert VariantMatcher(['Rattata', ''], 'Rattata').match('Alolan Rattata') is None
+
+
+def test_region_and_forme_spellings_match():
+    matcher = VariantMatcher(['Normal Forme', 'Attack Forme', 'Defense Forme', 'Speed Forme'], 'Deoxys')
+
+    assert matcher.match('Defense Form') == 2
+    assert matcher.match('Speed Forme') == 3
+    assert VariantMatcher(['Meowth', 'Alolan Form', 'Galarian Form'], 'Meowth').match('Galar Meowth') == 2
+
+
+def test_scoring_prefers_the_closest_label_over_the_first_hit():
+    matcher = VariantMatcher(['Calyrex', 'Ice Rider Calyrex', 'Shadow Rider Calyrex'], 'Calyrex')
+
+    assert matcher.match('Shadow Rider') == 2
+    assert matcher.match('Ice Rider') == 1
+
+
+def test_hidden_labels_and_unknown_variants_do_not_match():
+    matcher = VariantMatcher(['', '', ''], 'Deoxys')
+
+    assert matcher.match('Attack Forme') is None
+    assert VariantMatcher(['Venusaur', 'Mega Venusaur'], 'Venusaur').match('Gigantamax Venusaur') is None
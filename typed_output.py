@@ -0,0 +1,83 @@
+"""
+Typed columnar output for extracted Pokemon data.
+
+Turns the extractor's string records ("1.7 m", "90.5 kg") into a compact DataFrame
+straight away: heights and weights as float32 parsed with vectorized string ops,
+types and categories as pandas categoricals and the Pokedex Number as int16, so the
+notebook no longer needs its own conversion pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pokemon_html_parser import KEY_FIELDS, RECORD_FIELDS, iter_records_from_html
+
+POKEMON_TYPES = (
+    'Normal', 'Fire', 'Water', 'Grass', 'Electric', 'Ice', 'Fighting', 'Poison', 'Ground',
+    'Flying', 'Psychic', 'Bug', 'Rock', 'Ghost', 'Dragon', 'Dark', 'Steel', 'Fairy',
+)
+
+# Fixed categories so frames from different batches concatenate without falling back to object
+TYPE_DTYPE = pd.CategoricalDtype(POKEMON_TYPES)
+
+UNIT_PATTERNS = {
+    'Height (m)': r'(\d+(?:\.\d+)?)\+?\s*m\b',
+    'Weight (kg)': r'(\d+(?:\.\d+)?)\+?\s*kg\b',
+}
+
+
+def parse_measure(values, pattern):
+    """
+    Vectorized unit parsing: pull the number out of strings such as '1.7 m' or '28.0+ m'
+    Returns a float32 array; unknown values ('??? kg', NaN) become NaN
+    """
+    text = pd.Series(values, dtype='string')
+    number = text.str.extract(pattern, expand=False)
+    return pd.to_numeric(number, errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+def to_typed_frame(data):
+    '''
+    Takes a dictionary of pokemon data (as returned by get_more_pokemon_data) or a
+    DataFrame of it and returns a typed DataFrame. 'Pokedex Number' and 'Variation'
+    columns are typed too when present.
+    '''
+    frame = pd.DataFrame(data)
+    typed = pd.DataFrame(index=frame.index)
+
+    if 'Pokedex Number' in frame:
+        typed['Pokedex Number'] = pd.to_numeric(frame['Pokedex Number']).astype(np.int16)
+    typed['Pokemon'] = frame['Pokemon'].astype('string')
+    if 'Variation' in frame:
+        typed['Variation'] = frame['Variation'].astype('category')
+
+    typed['Category'] = frame['Category'].astype('category')
+    for column in ('Type 1', 'Type 2'):
+        typed[column] = frame[column].astype(TYPE_DTYPE)
+
+    for column, pattern in UNIT_PATTERNS.items():
+        values = frame[column]
+        if pd.api.types.is_numeric_dtype(values):
+            typed[column] = values.astype(np.float32)
+        else:
+            typed[column] = parse_measure(values, pattern)
+
+    return typed
+
+
+def frame_from_records(records):
+    """Build a typed DataFrame from streamed records (see iter_records_from_html)"""
+    columns = {name: [] for name in KEY_FIELDS + RECORD_FIELDS}
+    for record in records:
+        for name, values in columns.items():
+            values.append(record[name])
+    return to_typed_frame(columns)
+
+
+def get_more_pokemon_data_typed(df, pages, start, end):
+    '''
+    Takes a dataframe, a mapping of Link -> page HTML, and start and end index values
+    and returns a typed DataFrame with one row per extracted row, keyed by Pokedex
+    Number and Variation.
+    '''
+    return frame_from_records(iter_records_from_html(df, pages, start, end))
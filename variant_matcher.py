@@ -0,0 +1,108 @@
+"""
+Precompiled matcher from dataset Variation names to a page's variant labels.
+
+The labels of one infobox table (e.g. 'Charizard', 'Mega Charizard X', 'Alolan Rattata',
+'Defense Forme') are normalized once into an exact-name table, a Mega X/Y table and a
+token index. Lookups then touch only the labels that share a token with the variant,
+and ties are broken by a fixed score instead of whichever strategy hit first.
+"""
+
+import re
+
+# Spellings that name the same form, mapped to one canonical token
+TOKEN_ALIASES = {
+    'alola': 'alolan',
+    'galar': 'galarian',
+    'hisui': 'hisuian',
+    'paldea': 'paldean',
+    'forme': 'form',
+}
+
+# Tokens that say nothing about which form is meant
+GENERIC_TOKENS = frozenset({'form', 'pokemon', 'pokémon', 'the', 'of'})
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def normalize_label(label):
+    """Lowercase, collapse whitespace and non-breaking spaces."""
+    return ' '.join(str(label).replace('\xa0', ' ').lower().split())
+
+
+def label_tokens(label):
+    """Canonical tokens of a label, with region and form aliases folded together."""
+    return tuple(TOKEN_ALIASES.get(token, token) for token in _TOKEN.findall(normalize_label(label)))
+
+
+def _mega_tag(tokens):
+    return tokens[-1] if tokens and tokens[-1] in ('x', 'y') else ''
+
+
+class VariantMatcher:
+    """
+    Index over one table's variant labels. Empty labels (hidden cells) are never
+    matched, and the base form label is only matched by an exact name.
+    """
+
+    def __init__(self, labels, pokemon_name=None):
+        self.labels = list(labels)
+        species = set(label_tokens(pokemon_name)) if pokemon_name else set()
+        base = normalize_label(pokemon_name) if pokemon_name else None
+
+        self._exact = {}
+        self._mega = {}
+        self._distinctive = []
+        self._index = {}
+
+        for i, label in enumerate(self.labels):
+            name = normalize_label(label)
+            if not name:
+                self._distinctive.append(frozenset())
+                continue
+            self._exact.setdefault(name, i)
+            if name == base:
+                self._distinctive.append(frozenset())
+                continue
+
+            tokens = label_tokens(label)
+            if 'mega' in tokens:
+                self._mega.setdefault(_mega_tag(tokens), i)
+
+            distinctive = frozenset(t for t in tokens if t not in species and t not in GENERIC_TOKENS)
+            self._distinctive.append(distinctive)
+            for token in distinctive:
+                self._index.setdefault(token, []).append(i)
+
+        self._species = species
+
+    def match(self, variant):
+        """Index of the label for a variant, or None if nothing matches."""
+        exact = self._exact.get(normalize_label(variant))
+        if exact is not None:
+            return exact
+
+        tokens = label_tokens(variant)
+
+        # Mega X and Mega Y only ever match their own tag
+        if 'mega' in tokens and self._mega:
+            tag = _mega_tag(tokens)
+            if tag in self._mega:
+                return self._mega[tag]
+            if not tag and len(self._mega) == 1:
+                return next(iter(self._mega.values()))
+
+        wanted = frozenset(t for t in tokens if t not in self._species and t not in GENERIC_TOKENS)
+        candidates = {i for token in wanted for i in self._index.get(token, ())}
+        if not candidates:
+            return None
+
+        # Highest token overlap (Jaccard) wins; ties go to the earliest label
+        def score(i):
+            label_set = self._distinctive[i]
+            return len(wanted & label_set) / len(wanted | label_set), -i
+
+        return max(candidates, key=score)
+
+    def match_all(self, variants):
+        """Resolve every variant of a species in one call; returns a list of indices (or None)."""
+        return [self.match(variant) for variant in variants]